@@ -0,0 +1,105 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from api.metrics import RESPONSE_CACHE
+from api.tokens import PROCESS_LOCAL_CACHES
+
+
+def response_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def versions_shared():
+    """Видны ли сдвиги версий групп всем воркерам"""
+    return not isinstance(response_cache(), PROCESS_LOCAL_CACHES)
+
+
+def group_key(group):
+    return f'response-group:{group}'
+
+
+def stamp_key(group):
+    return f'response-group-stamp:{group}'
+
+
+def group_versions(groups):
+    """Текущие версии групп; отсутствующие создаются с новым значением.
+
+    Начальная версия берется из времени, чтобы после вытеснения ключа
+    версии из кеша старые ответы не стали снова актуальными. Версии живут
+    не дольше ответов (RESPONSE_CACHE_TIMEOUT): изменения без сигналов
+    (команды, queryset.update()) меняют ETag не позже, чем тело ответа.
+    """
+    cache = response_cache()
+    keys = [group_key(group) for group in groups]
+    versions = cache.get_many(keys)
+    for group, key in zip(groups, keys):
+        if key not in versions:
+            now = time.time_ns()
+            cache.add(key, now, settings.RESPONSE_CACHE_TIMEOUT)
+            cache.add(
+                stamp_key(group), now / 10 ** 9,
+                settings.RESPONSE_CACHE_TIMEOUT
+            )
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def group_validators(groups):
+    """Версии групп и время их последнего сдвига (None, если неизвестно).
+
+    Валидаторы условного GET для списков при общем для воркеров кеше
+    (versions_shared): не требуют запроса к БД и меняются вместе
+    с кешем ответов.
+    """
+    versions = group_versions(groups)
+    stamps = response_cache().get_many([stamp_key(group) for group in groups])
+    last_modified = (
+        max(stamps.values()) if len(stamps) == len(groups) else None
+    )
+    return versions, last_modified
+
+
+def invalidate(*groups):
+    """Сдвиг версий групп после фиксации транзакции"""
+    def bump():
+        cache = response_cache()
+        for group in groups:
+            try:
+                cache.incr(group_key(group))
+            except ValueError:
+                cache.add(
+                    group_key(group), time.time_ns(),
+                    settings.RESPONSE_CACHE_TIMEOUT
+                )
+            cache.set(
+                stamp_key(group), time.time(), settings.RESPONSE_CACHE_TIMEOUT
+            )
+    transaction.on_commit(bump)
+
+
+def response_key(request, groups):
+    """Ключ по хосту, пути, отсортированным параметрам и версиям групп"""
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    )
+    raw = repr((
+        request.get_host(), request.path, params, group_versions(groups)
+    ))
+    return 'response:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def get_cached(key):
+    data = response_cache().get(key)
+    RESPONSE_CACHE.labels('miss' if data is None else 'hit').inc()
+    return data
+
+
+def set_cached(key, data):
+    response_cache().set(key, data, settings.RESPONSE_CACHE_TIMEOUT)
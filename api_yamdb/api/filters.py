@@ -1,16 +1,139 @@
+import re
+
 import django_filters
+from django.db import connection
+from django.db.models import Count
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import ParseError
+from rest_framework.filters import BaseFilterBackend
+
+from reviews import fts
 from reviews.models import Title
 
+WORD = re.compile(r'\w+')
+
 
 class TitleFilter(django_filters.FilterSet):
+    GENRE_MODES = (('any', 'any'), ('all', 'all'))
+
     category = django_filters.CharFilter(field_name='category__slug')
-    genre = django_filters.CharFilter(field_name='genre__slug')
+    genre = django_filters.CharFilter(method='filter_genre')
+    genre_mode = django_filters.ChoiceFilter(
+        choices=GENRE_MODES,
+        method='filter_genre_mode'
+    )
     name = django_filters.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
     year = django_filters.NumberFilter(field_name='year')
+    year_min = django_filters.NumberFilter(
+        field_name='year',
+        lookup_expr='gte'
+    )
+    year_max = django_filters.NumberFilter(
+        field_name='year',
+        lookup_expr='lte'
+    )
 
     class Meta:
-        fields = ('category', 'genre', 'name', 'year')
+        fields = (
+            'category', 'genre', 'genre_mode', 'name',
+            'year', 'year_min', 'year_max'
+        )
         model = Title
+
+    def filter_genre(self, queryset, name, value):
+        """Жанры через запятую: `any` — хотя бы один, `all` — все.
+
+        Фильтр идет по id из подзапроса к таблице связей, без соединения
+        с жанрами, которое размножало бы строки произведений.
+        """
+        slugs = {slug.strip() for slug in value.split(',') if slug.strip()}
+        if not slugs:
+            return queryset
+        links = Title.genre.through.objects.filter(genre__slug__in=slugs)
+        if self.form.cleaned_data.get('genre_mode') == 'all':
+            links = links.values('title_id').annotate(
+                matched=Count('genre_id')
+            ).filter(matched=len(slugs))
+        return queryset.filter(id__in=links.values('title_id'))
+
+    def filter_genre_mode(self, queryset, name, value):
+        # режим учитывается в filter_genre
+        return queryset
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск `?search=` по названию и описанию.
+
+    Слова ищутся по префиксу, результаты упорядочены по bm25 с большим
+    весом названия. Без индекса FTS5 каждое слово ищется в названии
+    через icontains.
+    """
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        value = request.query_params.get(self.search_param, '')
+        terms = WORD.findall(value.lower().replace('ё', 'е'))
+        if not terms:
+            return queryset
+        if not fts.is_installed(connection):
+            for term in WORD.findall(value):
+                queryset = queryset.filter(name__icontains=term)
+            return queryset
+        match = ' '.join(f'"{term}"*' for term in terms)
+        table = fts.FTS_TABLE
+        # RawSQL в id__in оборачивается в скобки, и SQLite читает
+        # IN ((SELECT ...)) как список из одного значения
+        return queryset.extra(
+            where=[
+                f'reviews_title.id IN '
+                f'(SELECT rowid FROM {table} WHERE {table} MATCH %s)'
+            ],
+            params=[match],
+        ).annotate(search_rank=RawSQL(
+            f'SELECT bm25({table}, 10.0, 1.0) FROM {table} '
+            f'WHERE {table} MATCH %s AND rowid = reviews_title.id',
+            (match,)
+        )).order_by('search_rank', 'id')
+
+
+TITLE_FACETS = {
+    'genre': ('genre__slug', 'genre__name'),
+    'category': ('category__slug', 'category__name'),
+    'year': ('year',),
+}
+
+
+def title_facets(queryset, value):
+    """Счетчики `?facets=genre,category,year` по отфильтрованным произведениям.
+
+    На каждый фасет один сгруппированный запрос по id из подзапроса,
+    поэтому соединения фильтров не влияют на подсчет.
+    """
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = set(names) - set(TITLE_FACETS)
+    if unknown:
+        raise ParseError(
+            f'Неизвестные фасеты: {", ".join(sorted(unknown))}. '
+            f'Доступны: {", ".join(TITLE_FACETS)}'
+        )
+    titles = Title.objects.filter(id__in=queryset.order_by().values('id'))
+    facets = {}
+    for name in dict.fromkeys(names):
+        fields = TITLE_FACETS[name]
+        rows = titles.filter(
+            **{f'{fields[0]}__isnull': False}
+        ).order_by().values(*fields).annotate(
+            count=Count('id')
+        ).order_by('-count', fields[-1])
+        facets[name] = [
+            {
+                'count': row['count'],
+                **{field.split('__')[-1]: row[field] for field in fields},
+            }
+            for row in rows
+        ]
+    return facets
@@ -0,0 +1,230 @@
+import json
+import math
+import time
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from api.tokens import issue_token
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+BENCHMARK_USERNAME = 'benchmark_admin'
+# Кеш-заглушка для замера без кеша ответов
+COLD_CACHE_ALIAS = 'benchmark-cold'
+
+
+def percentile(values, percent):
+    """Перцентиль методом ближайшего ранга"""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку, число запросов к БД и прочитанные строки '
+        'для маршрутов API на текущих данных'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--output', help='Файл для JSON отчета (по умолчанию stdout)'
+        )
+        parser.add_argument(
+            '--baseline', help='JSON отчет, с которым сравнивать результаты'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимый рост p95 относительно baseline (доля)',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должен быть положительным')
+        self.iterations = options['iterations']
+        self.warmup = max(options['warmup'], 0)
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {issue_token(self.admin())}'
+        )
+        report = {}
+        # Бакеты ограничения частоты живут в кеше и не откатываются
+        # вместе с транзакцией: без лимитов замеряется обычный путь
+        # регистрации и выдачи токена, а не ответ 429
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+            REST_FRAMEWORK=dict(
+                settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={}
+            ),
+        ):
+            for name, method, path, data in self.routes():
+                report[name] = self.measure_route(method, path, data)
+                self.stderr.write(
+                    f'{name}: p95 {report[name]["p95_ms"]} мс, '
+                    f'{report[name]["queries"]} запросов'
+                )
+
+        content = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(content)
+        else:
+            self.stdout.write(content)
+
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as baseline:
+                regressions = self.compare(
+                    report, json.load(baseline), options['tolerance']
+                )
+            if regressions:
+                raise CommandError(
+                    'Регрессии производительности:\n' + '\n'.join(regressions)
+                )
+            self.stderr.write(self.style.SUCCESS('Регрессий не найдено'))
+
+    def admin(self):
+        user, _ = User.objects.get_or_create(
+            username=BENCHMARK_USERNAME,
+            defaults={
+                'email': f'{BENCHMARK_USERNAME}@yamdb.fake',
+                'role': User.ADMIN,
+            },
+        )
+        return user
+
+    def routes(self):
+        """Маршруты api/urls.py с параметрами из текущего набора данных"""
+        title = Title.objects.order_by('-review_count', 'id').first()
+        review = (
+            Review.objects.filter(title=title)
+            .annotate(comments=Count('comment'))
+            .order_by('-comments', 'id').first()
+        )
+        comment = Comment.objects.filter(review=review).first()
+        category = Category.objects.first()
+        genre = Genre.objects.first()
+        user = User.objects.exclude(username=BENCHMARK_USERNAME).first()
+        if None in (title, review, comment, category, genre, user):
+            raise CommandError(
+                'Недостаточно данных: запустите generate_dataset или '
+                'import_csv'
+            )
+        titles = '/api/v1/titles/'
+        reviews = f'{titles}{title.id}/reviews/'
+        comments = f'{reviews}{review.id}/comments/'
+        signup_user = User(username='benchmark_signup')
+        return (
+            ('titles-list', 'get', titles, None),
+            ('titles-detail', 'get', f'{titles}{title.id}/', None),
+            ('titles-list?category', 'get',
+             f'{titles}?category={category.slug}', None),
+            ('titles-list?genre', 'get', f'{titles}?genre={genre.slug}', None),
+            ('titles-list?name', 'get',
+             f'{titles}?name={title.name[:3]}', None),
+            ('titles-list?year', 'get', f'{titles}?year={title.year}', None),
+            ('titles-list?ordering', 'get',
+             f'{titles}?ordering=-rating,-review_count&cursor=', None),
+            ('titles-top', 'get', f'{titles}top/', None),
+            ('titles-trending', 'get', f'{titles}trending/', None),
+            ('titles-similar', 'get', f'{titles}{title.id}/similar/', None),
+            ('review-list', 'get', reviews, None),
+            ('review-detail', 'get', f'{reviews}{review.id}/', None),
+            ('comment-list', 'get', comments, None),
+            ('comment-detail', 'get', f'{comments}{comment.id}/', None),
+            ('users-list', 'get', '/api/v1/users/', None),
+            ('users-detail', 'get', f'/api/v1/users/{user.username}/', None),
+            ('users-me', 'get', '/api/v1/users/me/', None),
+            ('categories-list', 'get', '/api/v1/categories/', None),
+            ('genres-list', 'get', '/api/v1/genres/', None),
+            ('signup', 'post', '/api/v1/auth/signup/', {
+                'username': signup_user.username,
+                'email': 'benchmark_signup@yamdb.fake',
+            }),
+            ('token', 'post', '/api/v1/auth/token/', {
+                'username': user.username,
+                'confirmation_code': default_token_generator.make_token(user),
+            }),
+        )
+
+    def measure_route(self, method, path, data):
+        """Основные цифры - без кеша ответов, чтобы регрессии запросов
+        и задержки обработки были видны; для GET отдельно - с кешем"""
+        cold_caches = dict(settings.CACHES, **{COLD_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }})
+        with override_settings(
+            CACHES=cold_caches, RESPONSE_CACHE_ALIAS=COLD_CACHE_ALIAS
+        ):
+            result = self.measure(method, path, data)
+        if method == 'get':
+            warm = self.measure(method, path, data)
+            result['warm'] = {
+                key: warm[key]
+                for key in ('p50_ms', 'p95_ms', 'p99_ms', 'queries')
+            }
+        return result
+
+    def request(self, method, path, data):
+        # Изменяющие запросы откатываются, чтобы данные не менялись
+        with transaction.atomic():
+            response = getattr(self.client, method)(path, data=data)
+            transaction.set_rollback(method != 'get')
+        return response
+
+    def measure(self, method, path, data):
+        for _ in range(self.warmup):
+            self.request(method, path, data)
+        timings = []
+        for _ in range(self.iterations):
+            started = time.perf_counter()
+            self.request(method, path, data)
+            timings.append((time.perf_counter() - started) * 1000)
+        with CaptureQueriesContext(connection) as context:
+            response = self.request(method, path, data)
+        return {
+            'status': response.status_code,
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'queries': len(context.captured_queries),
+            'rows': self.rows_fetched(context.captured_queries),
+        }
+
+    @staticmethod
+    def rows_fetched(queries):
+        """Число строк, которые вернули SELECT запросы одного вызова"""
+        rows = 0
+        with connection.cursor() as cursor:
+            for query in queries:
+                if not query['sql'].lstrip().upper().startswith('SELECT'):
+                    continue
+                cursor.execute(f'SELECT COUNT(*) FROM ({query["sql"]})')
+                rows += cursor.fetchone()[0]
+        return rows
+
+    @staticmethod
+    def compare(report, baseline, tolerance):
+        regressions = []
+        for name, current in report.items():
+            previous = baseline.get(name)
+            if previous is None:
+                continue
+            if current['queries'] > previous['queries']:
+                regressions.append(
+                    f'{name}: запросов {previous["queries"]} -> '
+                    f'{current["queries"]}'
+                )
+            if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+                regressions.append(
+                    f'{name}: p95 {previous["p95_ms"]} -> '
+                    f'{current["p95_ms"]} мс'
+                )
+        return regressions
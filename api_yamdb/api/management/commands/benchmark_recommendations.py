@@ -0,0 +1,71 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.management.commands.rebuild_recommendations import (
+    add_factorization_arguments, factorization_options, load_ratings)
+from api.recommendations import factorize, top_titles
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время построения рекомендаций в зависимости '
+        'от числа отзывов (без записи в БД)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reviews', default='1000,5000,20000',
+            help='Числа отзывов через запятую (первые по id)',
+        )
+        parser.add_argument('--size', type=int, default=20)
+        parser.add_argument(
+            '--output', help='Файл для JSON отчета (по умолчанию stdout)'
+        )
+        add_factorization_arguments(parser)
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted({
+                int(size) for size in options['reviews'].split(',') if size
+            })
+        except ValueError:
+            raise CommandError('--reviews: ожидаются целые числа')
+        if not sizes or sizes[0] < 1:
+            raise CommandError('--reviews должен быть положительным')
+        factorization = factorization_options(options)
+        report = []
+        for size in sizes:
+            started = time.monotonic()
+            ratings = load_ratings(size)
+            loaded = time.monotonic()
+            if not ratings:
+                raise CommandError('Нет отзывов для построения рекомендаций')
+            model = factorize(ratings, **factorization)
+            factorized = time.monotonic()
+            recommendations = top_titles(
+                model, options['size'], factorization['workers']
+            )
+            finished = time.monotonic()
+            report.append({
+                'reviews': len(ratings),
+                'users': len(recommendations),
+                'titles': len(model.title_ids),
+                'load_s': round(loaded - started, 3),
+                'factorize_s': round(factorized - loaded, 3),
+                'scoring_s': round(finished - factorized, 3),
+                'build_s': round(finished - loaded, 3),
+            })
+            self.stderr.write(
+                f'{len(ratings)} отзывов: {finished - loaded:.2f} с'
+            )
+            if len(ratings) < size:
+                break
+
+        content = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(content)
+        else:
+            self.stdout.write(content)
@@ -0,0 +1,88 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.throttling import SignupAddressThrottle, SignupIdentityThrottle
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время проверки токен-бакетов регистрации '
+        '(адрес и имя/email) на бэкендах кеша из CACHES'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=10000,
+                            help='Проверок на каждый бэкенд')
+        parser.add_argument('--clients', type=int, default=1000,
+                            help='Разных адресов и пользователей')
+        parser.add_argument(
+            '--caches', default=settings.THROTTLE_CACHE_ALIAS,
+            help='Алиасы CACHES через запятую',
+        )
+        parser.add_argument(
+            '--output', help='Файл для JSON отчета (по умолчанию stdout)'
+        )
+
+    def handle(self, *args, **options):
+        if options['checks'] < 1 or options['clients'] < 1:
+            raise CommandError(
+                '--checks и --clients должны быть положительными'
+            )
+        aliases = [alias for alias in options['caches'].split(',') if alias]
+        unknown = set(aliases) - set(settings.CACHES)
+        if unknown:
+            raise CommandError(f'Нет в CACHES: {", ".join(sorted(unknown))}')
+
+        factory = APIRequestFactory()
+        requests = []
+        for number in range(options['clients']):
+            request = Request(factory.post(
+                '/api/v1/auth/signup/',
+                {'username': f'user{number}',
+                 'email': f'user{number}@yamdb.fake'},
+                format='json',
+                REMOTE_ADDR=f'10.0.{number // 256}.{number % 256}',
+            ), parsers=[JSONParser()])
+            request.data  # тело разбирается до замера, как во view
+            requests.append(request)
+
+        report = []
+        for alias in aliases:
+            with override_settings(THROTTLE_CACHE_ALIAS=alias):
+                report.append(self.measure(alias, requests, options['checks']))
+        content = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(content)
+        else:
+            self.stdout.write(content)
+
+    def measure(self, alias, requests, checks):
+        throttles = [SignupAddressThrottle(), SignupIdentityThrottle()]
+        for throttle in throttles:
+            # ставка не должна отклонять запросы во время замера
+            throttle.num_requests = checks
+        timings = []
+        for number in range(checks):
+            request = requests[number % len(requests)]
+            started = time.perf_counter_ns()
+            for throttle in throttles:
+                throttle.allow_request(request, None)
+            timings.append(time.perf_counter_ns() - started)
+        timings.sort()
+        mean = sum(timings) / len(timings) / 1000
+        self.stderr.write(f'{alias}: {mean:.1f} мкс на запрос')
+        return {
+            'cache': alias,
+            'backend': settings.CACHES[alias]['BACKEND'],
+            'checks': checks,
+            'mean_us': round(mean, 2),
+            'p99_us': round(timings[int(len(timings) * 0.99)] / 1000, 2),
+        }
@@ -0,0 +1,79 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.recommendations import recommend
+from reviews.models import Recommendation, Review
+
+
+def load_ratings(limit=None):
+    reviews = Review.objects.order_by('id').values_list(
+        'author_id', 'title_id', 'score'
+    )
+    if limit is not None:
+        reviews = reviews[:limit]
+    return list(reviews.iterator())
+
+
+def add_factorization_arguments(parser):
+    parser.add_argument('--rank', type=int, default=8,
+                        help='Число скрытых факторов')
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--regularization', type=float, default=0.1)
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1,
+        help='Число процессов для шагов ALS и подбора лучших произведений',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def factorization_options(options):
+    for name in ('rank', 'iterations', 'workers'):
+        if options[name] < 1:
+            raise CommandError(f'--{name} должен быть положительным')
+    if options['regularization'] <= 0:
+        raise CommandError('--regularization должен быть положительным')
+    return {
+        name: options[name]
+        for name in ('rank', 'iterations', 'regularization', 'workers', 'seed')
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает рекомендации пользователям по ALS-разложению '
+        'матрицы оценок из отзывов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=settings.RECOMMENDATIONS_SIZE,
+            help='Сколько рекомендаций хранить на пользователя',
+        )
+        add_factorization_arguments(parser)
+
+    def handle(self, *args, **options):
+        if options['size'] < 1:
+            raise CommandError('--size должен быть положительным')
+        started = time.monotonic()
+        ratings = load_ratings()
+        recommendations = recommend(
+            ratings, options['size'], **factorization_options(options)
+        )
+        with transaction.atomic():
+            Recommendation.objects.all().delete()
+            Recommendation.objects.bulk_create(
+                Recommendation(
+                    user_id=user_id, position=position, title_id=title_id,
+                    predicted_score=score,
+                )
+                for user_id, ranked in recommendations.items()
+                for position, (title_id, score) in enumerate(ranked, start=1)
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Рекомендации для {len(recommendations)} пользователей по '
+            f'{len(ratings)} отзывам за {time.monotonic() - started:.1f} с'
+        ))
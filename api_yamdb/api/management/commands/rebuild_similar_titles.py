@@ -0,0 +1,184 @@
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from scipy import sparse
+
+from api.cache import invalidate
+from reviews.models import Review, SimilarTitle, Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает таблицу похожих произведений: сходство жанров '
+        '(Жаккар) в смеси с косинусной близостью оценок'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=settings.SIMILAR_TITLES_SIZE,
+            help='Сколько соседей хранить для каждого произведения',
+        )
+        parser.add_argument(
+            '--genre-weight', type=float,
+            default=settings.SIMILAR_TITLES_GENRE_WEIGHT,
+            help='Доля сходства жанров в итоговой оценке (0..1)',
+        )
+        parser.add_argument(
+            '--shrink', type=float, default=10,
+            help='Сглаживание близости оценок при малом числе общих оценщиков',
+        )
+        parser.add_argument(
+            '--max-user-reviews', type=int, default=500,
+            help='Пользователи с большим числом отзывов не учитываются',
+        )
+        parser.add_argument(
+            '--block-size', type=int, default=1000,
+            help='Произведений в одном блоке умножения матриц (память)',
+        )
+
+    def handle(self, *args, **options):
+        if options['size'] < 1 or options['block_size'] < 1:
+            raise CommandError(
+                '--size и --block-size должны быть положительными'
+            )
+        if not 0 <= options['genre_weight'] <= 1:
+            raise CommandError('--genre-weight должен быть от 0 до 1')
+        self.genre_weight = options['genre_weight']
+        self.shrink = max(options['shrink'], 0)
+
+        self.title_ids = np.fromiter(
+            Title.objects.order_by('id').values_list('id', flat=True),
+            dtype=np.int64,
+        )
+        self.index = {
+            title_id: row for row, title_id in enumerate(self.title_ids)
+        }
+        self.load_genres()
+        self.load_scores(options['max_user_reviews'])
+
+        neighbors = []
+        block_size = options['block_size']
+        for start in range(0, len(self.title_ids), block_size):
+            block = self.similarities(start, start + block_size)
+            for row in range(block.shape[0]):
+                neighbors.extend(self.top(
+                    start + row, block, row, options['size']
+                ))
+        with transaction.atomic():
+            SimilarTitle.objects.all().delete()
+            SimilarTitle.objects.bulk_create(neighbors)
+            invalidate('similar')
+        self.stdout.write(self.style.SUCCESS(
+            f'Сохранено соседей: {len(neighbors)}'
+        ))
+
+    def matrix(self, rows, columns, values, width):
+        return sparse.csr_matrix(
+            (values, (rows, columns)), shape=(len(self.title_ids), width)
+        )
+
+    def load_genres(self):
+        """Бинарная матрица произведение × жанр и число жанров строк"""
+        links = list(Title.genre.through.objects.values_list(
+            'title_id', 'genre_id'
+        ).iterator())
+        genres = {genre_id: column for column, genre_id in enumerate(
+            sorted({genre_id for _, genre_id in links})
+        )}
+        self.genres = self.matrix(
+            [self.index[title_id] for title_id, _ in links],
+            [genres[genre_id] for _, genre_id in links],
+            np.ones(len(links)), len(genres),
+        )
+        self.genre_counts = np.asarray(self.genres.sum(axis=1)).ravel()
+
+    def load_scores(self, max_user_reviews):
+        """Оценки за вычетом средней оценки автора (adjusted cosine).
+
+        scores - центрированные оценки с нормированными строками,
+        raters - та же разреженность с единицами (число общих оценщиков).
+        """
+        reviews = np.array(
+            list(Review.objects.values_list(
+                'author_id', 'title_id', 'score'
+            ).iterator()),
+            dtype=np.float64,
+        ).reshape(-1, 3)
+        authors, users = np.unique(reviews[:, 0], return_inverse=True)
+        counts = np.bincount(users, minlength=len(authors))
+        means = np.bincount(
+            users, weights=reviews[:, 2], minlength=len(authors)
+        ) / np.maximum(counts, 1)
+        kept = (counts[users] >= 2) & (counts[users] <= max_user_reviews)
+        rows = np.array(
+            [self.index[title_id] for title_id in reviews[kept, 1]],
+            dtype=np.int64,
+        )
+        columns = users[kept]
+        centered = reviews[kept, 2] - means[columns]
+
+        norms = np.sqrt(np.bincount(
+            rows, weights=centered ** 2, minlength=len(self.title_ids)
+        ))
+        scaled = np.divide(
+            centered, norms[rows], out=np.zeros_like(centered),
+            where=norms[rows] > 0,
+        )
+        self.scores = self.matrix(rows, columns, scaled, len(authors))
+        self.scores.eliminate_zeros()
+        self.raters = self.matrix(
+            rows, columns, np.ones(len(rows)), len(authors)
+        )
+
+    def similarities(self, start, stop):
+        """Блок строк [start, stop) матрицы сходства произведений"""
+        # Жаккар по жанрам: общие жанры / объединение жанров
+        shared = (self.genres[start:stop] @ self.genres.T).tocoo()
+        union = (
+            self.genre_counts[start + shared.row]
+            + self.genre_counts[shared.col] - shared.data
+        )
+        result = self.genre_weight * sparse.csr_matrix(
+            (shared.data / union, (shared.row, shared.col)),
+            shape=shared.shape,
+        )
+
+        # Косинус центрированных оценок со сглаживанием по числу
+        # общих оценщиков
+        if self.genre_weight < 1:
+            cosine = self.scores[start:stop] @ self.scores.T
+            confidence = self.raters[start:stop] @ self.raters.T
+            confidence.data = confidence.data / (
+                confidence.data + self.shrink
+            )
+            result = result + (1 - self.genre_weight) * cosine.multiply(
+                confidence
+            )
+        return sparse.csr_matrix(result)
+
+    def top(self, title_row, block, row, size):
+        """Лучшие size соседей строки: сходство по убыванию, затем id"""
+        begin, end = block.indptr[row], block.indptr[row + 1]
+        columns = block.indices[begin:end]
+        values = block.data[begin:end]
+        keep = (values > 0) & (columns != title_row)
+        columns, values = columns[keep], values[keep]
+        if len(values) > size:
+            # граница по size-му значению, равные ей остаются для сортировки
+            threshold = np.partition(values, len(values) - size)[
+                len(values) - size
+            ]
+            columns, values = (
+                columns[values >= threshold], values[values >= threshold]
+            )
+        similar_ids = self.title_ids[columns]
+        order = np.lexsort((similar_ids, -values))[:size]
+        return [
+            SimilarTitle(
+                title_id=int(self.title_ids[title_row]), position=position,
+                similar_id=int(similar_ids[index]),
+                similarity=float(values[index]),
+            )
+            for position, index in enumerate(order, start=1)
+        ]
@@ -0,0 +1,115 @@
+import heapq
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+
+from api.cache import invalidate
+from reviews.models import Title, TopTitle
+
+
+def weighted_rating(score_sum, review_count, prior_mean, prior_weight):
+    """Средняя оценка, сглаженная prior_weight отзывами с оценкой prior_mean"""
+    return (
+        (score_sum + prior_weight * prior_mean)
+        / (review_count + prior_weight)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает списки лучших произведений (общий, по категориям '
+        'и жанрам) по взвешенному рейтингу'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=settings.TOP_TITLES_SIZE,
+            help='Сколько мест хранить в каждом списке',
+        )
+        parser.add_argument(
+            '--prior-weight', type=float,
+            default=settings.TOP_TITLES_PRIOR_WEIGHT,
+            help='Вес априорной оценки в отзывах',
+        )
+        parser.add_argument(
+            '--prior-mean', type=float,
+            default=settings.TOP_TITLES_PRIOR_MEAN,
+            help='Априорная оценка (по умолчанию средняя по всем отзывам)',
+        )
+
+    def handle(self, *args, **options):
+        size = options['size']
+        prior_weight = options['prior_weight']
+        if size < 1:
+            raise CommandError('--size должен быть положительным')
+        if prior_weight < 0:
+            raise CommandError('--prior-weight не может быть отрицательным')
+
+        # Агрегаты отзывов уже хранятся в произведениях
+        reviewed = Title.objects.filter(review_count__gt=0)
+        prior_mean = options['prior_mean']
+        if prior_mean is None:
+            totals = reviewed.aggregate(
+                scores=Sum('score_sum'), reviews=Sum('review_count')
+            )
+            prior_mean = (
+                totals['scores'] / totals['reviews']
+                if totals['reviews'] else 0
+            )
+
+        boards = defaultdict(list)
+        rows = reviewed.values_list(
+            'id', 'category_id', 'score_sum', 'review_count'
+        )
+        ratings = {}
+        for title_id, category_id, score_sum, review_count in rows.iterator():
+            rating = weighted_rating(
+                score_sum, review_count, prior_mean, prior_weight
+            )
+            ratings[title_id] = rating
+            self.push(boards[(TopTitle.ALL, 0)], size, rating, title_id)
+            if category_id is not None:
+                self.push(
+                    boards[(TopTitle.CATEGORY, category_id)],
+                    size, rating, title_id
+                )
+        links = Title.genre.through.objects.filter(
+            title_id__in=reviewed.values('id')
+        ).values_list('title_id', 'genre_id')
+        for title_id, genre_id in links.iterator():
+            self.push(
+                boards[(TopTitle.GENRE, genre_id)],
+                size, ratings[title_id], title_id
+            )
+
+        places = [
+            TopTitle(
+                scope=scope, scope_id=scope_id, position=position,
+                title_id=title_id, weighted_rating=rating,
+            )
+            for (scope, scope_id), board in boards.items()
+            for position, (rating, title_id) in enumerate(
+                sorted(board, key=lambda place: (-place[0], -place[1])),
+                start=1
+            )
+        ]
+        with transaction.atomic():
+            TopTitle.objects.all().delete()
+            TopTitle.objects.bulk_create(places)
+            invalidate('top')
+        self.stdout.write(self.style.SUCCESS(
+            f'Списков: {len(boards)}, мест: {len(places)}, '
+            f'априорная оценка {prior_mean:.2f} с весом {prior_weight:g}'
+        ))
+
+    @staticmethod
+    def push(board, size, rating, title_id):
+        # Куча из size лучших; при равном рейтинге выше более новое
+        # произведение
+        if len(board) < size:
+            heapq.heappush(board, (rating, title_id))
+        elif (rating, title_id) > board[0]:
+            heapq.heapreplace(board, (rating, title_id))
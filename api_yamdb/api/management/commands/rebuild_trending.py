@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.trending import add_heat, heap
+from reviews.models import Comment, Review, TitleTrend
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает затухающую активность произведений по всем отзывам '
+        'и комментариям (после import_csv, generate_dataset или смены '
+        'настроек TRENDING_*)'
+    )
+
+    def handle(self, *args, **options):
+        heat = {}
+        events = (
+            (Review.objects.values_list('title_id', 'pub_date'),
+             settings.TRENDING_REVIEW_WEIGHT),
+            (Comment.objects.values_list('review__title_id', 'pub_date'),
+             settings.TRENDING_COMMENT_WEIGHT),
+        )
+        for rows, weight in events:
+            for title_id, pub_date in rows.iterator():
+                heat[title_id] = add_heat(
+                    heat.get(title_id), weight, pub_date
+                )
+        with transaction.atomic():
+            TitleTrend.objects.all().delete()
+            TitleTrend.objects.bulk_create(
+                TitleTrend(title_id=title_id, heat=value)
+                for title_id, value in heat.items()
+            )
+        heap.reset()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитана активность {len(heat)} произведений'
+        ))
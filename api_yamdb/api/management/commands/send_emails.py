@@ -0,0 +1,64 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.outbox import deliver_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди OutgoingEmail пачками в нескольких '
+        'потоках с повторами и экспоненциальной задержкой'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Число потоков отправки')
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Писем на одно SMTP соединение')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Пауза при пустой очереди, с')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Отправить то, что пора отправлять, и завершиться',
+        )
+
+    def handle(self, *args, **options):
+        for name in ('workers', 'batch_size'):
+            if options[name] < 1:
+                raise CommandError(
+                    f'--{name.replace("_", "-")} должен быть положительным'
+                )
+        self.batch_size = options['batch_size']
+        self.poll_interval = options['poll_interval']
+        self.once = options['once']
+        self.stop = threading.Event()
+        with ThreadPoolExecutor(options['workers']) as pool:
+            futures = [
+                pool.submit(self.work) for _ in range(options['workers'])
+            ]
+            try:
+                sent = sum(future.result() for future in futures)
+            except KeyboardInterrupt:
+                self.stop.set()
+                sent = sum(future.result() for future in futures)
+        self.stdout.write(self.style.SUCCESS(f'Обработано писем: {sent}'))
+
+    def work(self):
+        processed = 0
+        try:
+            while not self.stop.is_set():
+                delivered = deliver_batch(self.batch_size)
+                processed += delivered
+                if delivered:
+                    continue
+                if self.once:
+                    break
+                time.sleep(self.poll_interval)
+        finally:
+            # у каждого потока свое соединение с БД
+            connection.close()
+        return processed
@@ -0,0 +1,60 @@
+import os
+
+from django.http import HttpResponse
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+
+REQUESTS = Counter(
+    'yamdb_http_requests_total',
+    'Количество запросов к API',
+    ('route', 'method', 'status'),
+)
+LATENCY = Histogram(
+    'yamdb_http_request_duration_seconds',
+    'Время обработки запроса',
+    ('route', 'method'),
+)
+DB_QUERIES = Histogram(
+    'yamdb_http_request_db_queries',
+    'Количество SQL запросов на один запрос к API',
+    ('route', 'method'),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, float('inf')),
+)
+IN_PROGRESS = Gauge(
+    'yamdb_http_requests_in_progress',
+    'Запросы к API в обработке',
+    multiprocess_mode='livesum',
+)
+
+RESPONSE_CACHE = Counter(
+    'yamdb_response_cache_total',
+    'Обращения к кешу ответов API',
+    ('result',),
+)
+USER_CACHE = Counter(
+    'yamdb_user_cache_total',
+    'Обращения к кешу имени и роли пользователей',
+    ('result',),
+)
+THROTTLED = Counter(
+    'yamdb_throttled_requests_total',
+    'Запросы, отклоненные ограничением частоты',
+    ('scope',),
+)
+
+
+def metrics(request):
+    """Метрики в текстовом формате Prometheus.
+
+    Если задана переменная окружения PROMETHEUS_MULTIPROC_DIR, значения
+    собираются из общего каталога всех процессов-воркеров.
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(
+        generate_latest(registry), content_type=CONTENT_TYPE_LATEST
+    )
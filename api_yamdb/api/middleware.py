@@ -0,0 +1,133 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+from api.metrics import DB_QUERIES, IN_PROGRESS, LATENCY, REQUESTS
+
+slow_log = logging.getLogger('api.slow_requests')
+
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """SQL без значений: параметры уже вынесены, сворачиваем списки IN"""
+    return IN_LIST.sub('IN (...)', WHITESPACE.sub(' ', sql).strip())
+
+
+def view_name(request):
+    """Имя вида в форме `TitleViewSet.list` или `signup`"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    view = getattr(match.func, 'cls', None)
+    if view is None:
+        return match.view_name
+    actions = getattr(match.func, 'actions', None)
+    if actions and request.method.lower() in actions:
+        return f'{view.__name__}.{actions[request.method.lower()]}'
+    return view.__name__
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+    def summary(self):
+        counts = Counter(normalize_sql(sql) for sql, _ in self.queries)
+        slowest_sql, slowest_time = max(
+            self.queries, key=lambda query: query[1], default=('', 0)
+        )
+        return {
+            'queries': len(self.queries),
+            'db_ms': round(
+                sum(duration for _, duration in self.queries) * 1000, 3
+            ),
+            'duplicates': {
+                sql: count for sql, count in counts.items() if count > 1
+            },
+            'slowest_ms': round(slowest_time * 1000, 3),
+            'slowest_sql': normalize_sql(slowest_sql),
+        }
+
+
+class QueryInstrumentationMiddleware:
+    """Число и время SQL запросов запроса в заголовке Server-Timing.
+
+    Запросы дольше SLOW_REQUEST_THRESHOLD_MS пишутся в лог
+    `api.slow_requests` одной JSON строкой.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        total_ms = round((time.perf_counter() - started) * 1000, 3)
+        summary = recorder.summary()
+        repeated = sum(
+            count - 1 for count in summary['duplicates'].values()
+        )
+
+        response['Server-Timing'] = ', '.join((
+            f'total;dur={total_ms}',
+            f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries"',
+            f'db-duplicates;desc="{repeated}"',
+            f'db-slowest;dur={summary["slowest_ms"]}',
+        ))
+        if total_ms >= settings.SLOW_REQUEST_THRESHOLD_MS:
+            slow_log.warning(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': view_name(request),
+                'status': response.status_code,
+                'total_ms': total_ms,
+                **summary,
+            }, ensure_ascii=False))
+        return response
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """Счетчики, задержки и число SQL запросов по маршрутам роутера"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with IN_PROGRESS.track_inprogress(), \
+                connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        route = match.url_name if match and match.url_name else 'unmatched'
+        REQUESTS.labels(route, request.method, response.status_code).inc()
+        LATENCY.labels(route, request.method).observe(elapsed)
+        DB_QUERIES.labels(route, request.method).observe(counter.count)
+        return response
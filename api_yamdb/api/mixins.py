@@ -1,4 +1,14 @@
-from rest_framework import mixins, viewsets
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, status, viewsets
+from rest_framework.response import Response
+
+from api import cache
 
 
 class ListCreateDestroyViewSet(
@@ -8,3 +18,143 @@ class ListCreateDestroyViewSet(
     viewsets.GenericViewSet
 ):
     pass
+
+
+class CachedResponseMixin:
+    """Общая часть кеширования ответов на чтение.
+
+    Вьюсет задает группы инвалидации в get_cache_groups(), версии групп
+    сдвигаются сигналами из api/signals.py.
+    """
+
+    def get_cache_groups(self):
+        raise NotImplementedError
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = cache.response_key(request, self.get_cache_groups())
+        data = cache.get_cached(key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set_cached(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalResponseMixin:
+    """ETag и Last-Modified для чтения; 304 отдается без сериализации."""
+
+    last_modified_fields = ('updated_at',)
+    # Группы кеша ответов для данных, которых нет в last_modified_fields
+    # (например, имена авторов): их версии входят в ETag
+    validator_groups = ()
+
+    def aggregate_validators(self, request, queryset):
+        """Валидаторы одним агрегирующим запросом по полям
+        last_modified_fields и версиям групп validator_groups"""
+        aggregates = {
+            f'last_{index}': Max(field)
+            for index, field in enumerate(self.last_modified_fields)
+        }
+        values = queryset.order_by().aggregate(
+            total=Count('id', distinct=True), **aggregates
+        )
+        total = values.pop('total')
+        timestamps = [value for value in values.values() if value]
+        if not total or not timestamps:
+            return None, None
+        last_modified = max(timestamps).timestamp()
+        versions = []
+        if self.validator_groups:
+            versions, stamp = cache.group_validators(self.validator_groups)
+            last_modified = max(last_modified, stamp or 0)
+        params = sorted(request.query_params.lists())
+        raw = repr((
+            request.path, params, total, sorted(timestamps), versions
+        ))
+        etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+        return etag, last_modified
+
+    def conditional_response(self, validators, handler, request,
+                             *args, **kwargs):
+        etag, last_modified = validators
+        if etag is None:
+            return handler(request, *args, **kwargs)
+        timestamp = last_modified and int(last_modified)
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if not_modified is not None:
+            return not_modified
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+            if timestamp:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+class ConditionalListMixin(ConditionalResponseMixin):
+    """Валидаторы списка - версии групп кеша ответов (get_cache_groups).
+
+    Список меняется только вместе со сдвигом его групп, поэтому
+    проверка не обращается к БД и не зависит от размера таблицы.
+    Если кеш ответов локален для процесса, сдвиг в другом воркере здесь
+    не виден, и валидаторы считаются агрегатом по отфильтрованному
+    списку.
+    """
+
+    def list_validators(self, request):
+        if not cache.versions_shared():
+            return self.aggregate_validators(
+                request, self.filter_queryset(self.get_queryset())
+            )
+        versions, last_modified = cache.group_validators(
+            self.get_cache_groups()
+        )
+        params = sorted(request.query_params.lists())
+        raw = repr((request.get_host(), request.path, params, versions))
+        etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+        return etag, last_modified
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.list_validators(request),
+            super().list, request, *args, **kwargs
+        )
+
+
+class ConditionalRetrieveMixin(ConditionalResponseMixin):
+    """Валидаторы объекта - один агрегирующий запрос по полям
+    last_modified_fields."""
+
+    def object_validators(self, request, queryset):
+        return self.aggregate_validators(request, queryset)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.get_queryset().filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+            validators = self.object_validators(request, queryset)
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        return self.conditional_response(
+            validators, super().retrieve, request, *args, **kwargs
+        )
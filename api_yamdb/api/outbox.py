@@ -0,0 +1,118 @@
+"""Очередь исходящих писем в таблице OutgoingEmail.
+
+Запрос только добавляет письма в таблицу; отправляет их команда
+send_emails (или сразу после коммита при EMAIL_OUTBOX_EAGER). Воркер
+забирает пачку писем одним UPDATE с отметкой claimed_by, отправляет
+ее через одно SMTP соединение и откладывает неудачные письма
+с экспоненциальной задержкой.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+
+def enqueue(messages):
+    """Добавить письма [(тема, текст, получатель), ...] в очередь"""
+    emails = OutgoingEmail.objects.bulk_create(
+        OutgoingEmail(subject=subject, body=body, to=to)
+        for subject, body, to in messages
+    )
+    if settings.EMAIL_OUTBOX_EAGER:
+        transaction.on_commit(deliver_pending)
+    return emails
+
+
+def backoff(attempts):
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_BACKOFF * 2 ** (attempts - 1)
+    )
+
+
+def claim(batch_size):
+    """Забрать до batch_size писем, которым пора уходить"""
+    now = timezone.now()
+    claim_id = uuid.uuid4()
+    due = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.PENDING, next_attempt_at__lte=now
+    )
+    # Условие повторяется во внешнем UPDATE: письмо, которое успел
+    # забрать другой воркер, уже не подходит по next_attempt_at
+    due.filter(
+        id__in=list(due.order_by('next_attempt_at', 'id').values_list(
+            'id', flat=True
+        )[:batch_size])
+    ).update(
+        claimed_by=claim_id,
+        next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE),
+    )
+    return list(OutgoingEmail.objects.filter(claimed_by=claim_id))
+
+
+def send_batch(emails):
+    """Отправить письма через одно соединение; (отправленные, ошибки)"""
+    sent, failed = [], []
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        return sent, [(email, error) for email in emails]
+    try:
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject, body=email.body,
+                from_email=email.from_email or None, to=[email.to],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                failed.append((email, error))
+            else:
+                sent.append(email)
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def record(sent, failed):
+    now = timezone.now()
+    OutgoingEmail.objects.filter(id__in=[email.id for email in sent]).update(
+        status=OutgoingEmail.SENT, sent_at=now, claimed_by=None,
+        attempts=F('attempts') + 1,
+    )
+    for email, error in failed:
+        attempts = email.attempts + 1
+        exhausted = attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        OutgoingEmail.objects.filter(id=email.id).update(
+            status=OutgoingEmail.FAILED if exhausted
+            else OutgoingEmail.PENDING,
+            attempts=attempts,
+            next_attempt_at=now + backoff(attempts),
+            last_error=repr(error),
+            claimed_by=None,
+        )
+
+
+def deliver_batch(batch_size):
+    """Одна пачка: забрать, отправить, записать результат"""
+    emails = claim(batch_size)
+    if emails:
+        record(*send_batch(emails))
+    return len(emails)
+
+
+def deliver_pending(batch_size=100):
+    """Отправлять пачки, пока в очереди есть письма к отправке"""
+    total = 0
+    while True:
+        delivered = deliver_batch(batch_size)
+        total += delivered
+        if not delivered:
+            return total
@@ -0,0 +1,143 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """Limit/offset пагинация с опциональным keyset-режимом.
+
+    Если в запросе передан параметр `cursor`, страницы строятся по ключу
+    сортировки без OFFSET и без COUNT(*). Ключ берется из сортировки
+    запроса (например, `?ordering=`), иначе из `keyset_ordering` вида
+    или `ordering` пагинатора; в конец ключа добавляется id.
+    Пустой `cursor` означает первую страницу.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+    ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.model = queryset.model
+        self.keys = self.get_keyset_ordering(queryset, view)
+        position = self.decode_cursor(
+            request.query_params[self.cursor_query_param]
+        )
+        queryset = queryset.order_by(*self.keys)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+        page = list(queryset[:self.limit + 1])
+        self.has_next = len(page) > self.limit
+        page = page[:self.limit]
+        self.last = page[-1] if page else None
+        return page
+
+    def get_keyset_ordering(self, queryset, view):
+        ordering = [
+            key for key in queryset.query.order_by if isinstance(key, str)
+        ]
+        if not ordering:
+            ordering = list(getattr(view, 'keyset_ordering', self.ordering))
+        ordering = [
+            key.replace('pk', 'id') if key.lstrip('-') == 'pk' else key
+            for key in ordering
+        ]
+        if not {'id', '-id'} & set(ordering):
+            # id в том же направлении, что и последний ключ, чтобы
+            # сортировка шла по индексу (ключ, id) без временного дерева
+            ordering.append('-id' if ordering[-1].startswith('-') else 'id')
+        return tuple(ordering[:ordering.index(
+            'id' if 'id' in ordering else '-id'
+        ) + 1])
+
+    def after(self, position):
+        """Условие «строго после позиции» для сортировки self.keys.
+
+        NULL считается меньше любого значения, как при сортировке
+        в SQLite, поэтому NULL идут первыми по возрастанию
+        и последними по убыванию.
+        """
+        condition = None
+        for key, value in reversed(list(zip(self.keys, position))):
+            name = key.lstrip('-')
+            descending = key.startswith('-')
+            nullable = self.field(key) is None or self.field(key).null
+            if value is None:
+                # после NULL по убыванию идут только NULL
+                same = Q(**{f'{name}__isnull': True})
+                beyond = None if descending else ~same
+            else:
+                lookup = 'lt' if descending else 'gt'
+                beyond = Q(**{f'{name}__{lookup}': value})
+                if descending and nullable:
+                    beyond |= Q(**{f'{name}__isnull': True})
+                same = Q(**{name: value})
+            parts = [part for part in (
+                beyond, same & condition if condition is not None else None
+            ) if part is not None]
+            condition = parts[0] if len(parts) == 1 else parts[0] | parts[1]
+        return condition
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_cursor_link()),
+            ('results', data)
+        ]))
+
+    def get_next_cursor_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.last)
+        )
+
+    def field(self, key):
+        try:
+            return self.model._meta.get_field(key.lstrip('-'))
+        except FieldDoesNotExist:
+            # аннотация, например ранг поиска, хранится в курсоре как есть
+            return None
+
+    def encode_cursor(self, obj):
+        position = []
+        for key in self.keys:
+            field = self.field(key)
+            value = getattr(obj, key.lstrip('-'))
+            if field is not None and value is not None:
+                value = field.value_to_string(obj)
+            position.append(value)
+        position = json.dumps(position)
+        return urlsafe_b64encode(position.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(cursor.encode('ascii')))
+            if (not isinstance(position, list)
+                    or len(position) != len(self.keys)):
+                raise ValueError
+            return [
+                value if value is None or self.field(key) is None
+                else self.field(key).to_python(value)
+                for key, value in zip(self.keys, position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
@@ -38,6 +38,6 @@ class ReviewCommentCustomPermission(permissions.BasePermission):
         elif isinstance(user, AnonymousUser):
             return False
         else:
-            return obj.author == user or (
+            return obj.author_id == user.pk or (
                 user.is_admin or user.is_superuser or user.is_moderator
             )
@@ -0,0 +1,94 @@
+"""Массовое создание пользователей администратором.
+
+Строки проверяются сериализатором без обращения к БД, уникальность
+username и email - одним запросом на всю пачку, новые пользователи
+вставляются через bulk_create. Ошибочные строки возвращаются
+с номером и не мешают созданию остальных.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from api.authentication import confirmation_email
+from api.outbox import enqueue
+from api.serializers import BulkUserSerializer
+from users.models import User
+
+USERNAME_TAKEN = 'Пользователь с таким именем уже существует.'
+EMAIL_TAKEN = 'Пользователь с таким email уже существует.'
+CONFLICT = 'Имя или email занял другой запрос.'
+
+
+def validate_rows(rows):
+    """[(номер, данные)] корректных строк и {номер: ошибки}"""
+    serializer = BulkUserSerializer()
+    valid, errors = [], {}
+    for number, row in enumerate(rows):
+        try:
+            valid.append((number, serializer.run_validation(row)))
+        except ValidationError as error:
+            errors[number] = error.detail
+    return valid, errors
+
+
+def check_unique(valid, errors):
+    """Отсеять строки с занятыми в БД или повторенными в пачке полями"""
+    existing = User.objects.filter(
+        Q(username__in=[data['username'] for _, data in valid])
+        | Q(email__in=[data['email'] for _, data in valid])
+    ).values_list('username', 'email')
+    usernames, emails = set(), set()
+    for username, email in existing:
+        usernames.add(username)
+        emails.add(email)
+    unique = []
+    for number, data in valid:
+        row_errors = {}
+        if data['username'] in usernames:
+            row_errors['username'] = [USERNAME_TAKEN]
+        if data['email'] in emails:
+            row_errors['email'] = [EMAIL_TAKEN]
+        if row_errors:
+            errors[number] = row_errors
+            continue
+        # первая строка занимает имя и email, повторы в пачке - ошибки
+        usernames.add(data['username'])
+        emails.add(data['email'])
+        unique.append((number, data))
+    return unique
+
+
+def insert(unique, errors):
+    """bulk_create; при гонке с другим запросом - по одной строке"""
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(User(**data) for _, data in unique)
+        return [data['username'] for _, data in unique]
+    except IntegrityError:
+        pass
+    created = []
+    for number, data in unique:
+        try:
+            with transaction.atomic():
+                User.objects.create(**data)
+        except IntegrityError:
+            errors[number] = {'non_field_errors': [CONFLICT]}
+        else:
+            created.append(data['username'])
+    return created
+
+
+def provision_users(rows, send_codes=False):
+    """Создать пользователей из строк; (созданные имена, ошибки строк)"""
+    valid, errors = validate_rows(rows)
+    unique = check_unique(valid, errors) if valid else []
+    created = insert(unique, errors) if unique else []
+    if send_codes and created:
+        # bulk_create в SQLite не возвращает id, а код строится по id
+        enqueue([
+            confirmation_email(user)
+            for user in User.objects.filter(username__in=created)
+        ])
+    return created, [
+        {'row': number, 'errors': errors[number]} for number in sorted(errors)
+    ]
@@ -0,0 +1,184 @@
+"""Рекомендации по оценкам: ALS-разложение матрицы пользователь × произведение.
+
+Матрица хранится разреженно (CSR по пользователям и по произведениям),
+шаг ALS решает для каждой строки систему k × k, поэтому стоимость
+итерации линейна по числу отзывов. Лучшие произведения выбираются
+умножением блока факторов пользователей на матрицу факторов произведений.
+
+Строки шагов ALS и блоки пользователей делятся между процессами.
+Данные передаются воркерам через initializer пула, а модуль не зависит
+от Django, поэтому пул работает при любом способе запуска процессов
+(fork, spawn, forkserver).
+"""
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+# Способ запуска процессов пула; None - способ по умолчанию для ОС
+START_METHOD = None
+# Строк в задаче шага ALS
+SOLVE_CHUNK = 5000
+# Предел размера плотного блока оценок пользователи × произведения
+SCORE_BLOCK = 10 ** 7
+
+Factorization = namedtuple('Factorization', (
+    'mean', 'user_ids', 'title_ids', 'ratings', 'user_factors',
+    'title_factors',
+))
+
+# Данные задач пула: заполняются initializer в каждом воркере
+# (или в текущем процессе, если пул не нужен)
+_shared = {}
+
+
+def _init_worker(shared):
+    _shared.clear()
+    _shared.update(shared)
+
+
+def run(function, tasks, workers, shared):
+    """Результаты function по задачам, в workers процессах"""
+    if workers <= 1 or len(tasks) < 2:
+        _init_worker(shared)
+        try:
+            return [function(task) for task in tasks]
+        finally:
+            _shared.clear()
+    context = multiprocessing.get_context(START_METHOD)
+    with ProcessPoolExecutor(
+        workers, mp_context=context, initializer=_init_worker,
+        initargs=(shared,),
+    ) as pool:
+        return list(pool.map(function, tasks))
+
+
+def chunks(size, step):
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def rating_matrix(ratings):
+    """Средняя оценка, id пользователей и произведений по индексам строк
+    и столбцов и CSR матрица оценок без средней"""
+    data = np.asarray(ratings, dtype=np.float64).reshape(-1, 3)
+    user_ids, users = np.unique(
+        data[:, 0].astype(np.int64), return_inverse=True
+    )
+    title_ids, titles = np.unique(
+        data[:, 1].astype(np.int64), return_inverse=True
+    )
+    mean = data[:, 2].mean()
+    # нулевые остатки остаются явными элементами: они входят в систему
+    # строки и в число оценок для регуляризации
+    matrix = sparse.csr_matrix(
+        (data[:, 2] - mean, (users, titles)),
+        shape=(len(user_ids), len(title_ids)),
+    )
+    return mean, user_ids, title_ids, matrix
+
+
+def solve_rows(bounds):
+    """Шаг ALS для строк [start, stop) матрицы _shared['matrix']"""
+    start, stop = bounds
+    matrix = _shared['matrix']
+    factors = _shared['factors']
+    regularization = _shared['regularization']
+    identity = np.eye(factors.shape[1])
+    solved = np.zeros((stop - start, factors.shape[1]))
+    for row in range(start, stop):
+        begin, end = matrix.indptr[row], matrix.indptr[row + 1]
+        fixed = factors[matrix.indices[begin:end]]
+        # ALS-WR: регуляризация пропорциональна числу оценок
+        gram = fixed.T @ fixed + regularization * (end - begin) * identity
+        solved[row - start] = np.linalg.solve(
+            gram, fixed.T @ matrix.data[begin:end]
+        )
+    return solved
+
+
+def solve_side(matrix, factors, regularization, workers):
+    parts = run(
+        solve_rows, chunks(matrix.shape[0], SOLVE_CHUNK), workers,
+        {'matrix': matrix, 'factors': factors,
+         'regularization': regularization},
+    )
+    return np.vstack(parts)
+
+
+def factorize(ratings, rank=8, iterations=10, regularization=0.1,
+              workers=1, seed=0):
+    """Факторы пользователей и произведений для оценок без средней"""
+    mean, user_ids, title_ids, by_user = rating_matrix(ratings)
+    by_title = by_user.T.tocsr()
+    rng = np.random.default_rng(seed)
+    title_factors = rng.normal(0, 0.1, (len(title_ids), rank))
+    user_factors = np.zeros((len(user_ids), rank))
+    for _ in range(iterations):
+        user_factors = solve_side(
+            by_user, title_factors, regularization, workers
+        )
+        title_factors = solve_side(
+            by_title, user_factors, regularization, workers
+        )
+    return Factorization(
+        mean, user_ids, title_ids, by_user, user_factors, title_factors
+    )
+
+
+def score_users(bounds):
+    """Лучшие непросмотренные произведения пользователей [start, stop):
+    индексы произведений и оценки без средней, по убыванию"""
+    start, stop = bounds
+    scores = _shared['users'][start:stop] @ _shared['titles'].T
+    seen = _shared['seen'][start:stop]
+    scores[
+        np.repeat(np.arange(stop - start), np.diff(seen.indptr)),
+        seen.indices,
+    ] = -np.inf
+    size = min(_shared['size'], scores.shape[1])
+    best = np.argpartition(scores, -size, axis=1)[:, -size:]
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind='stable')
+    return (
+        np.take_along_axis(best, order, axis=1),
+        np.take_along_axis(best_scores, order, axis=1),
+    )
+
+
+def top_titles(model, size, workers=1):
+    """{user_id: [(title_id, предсказанная оценка), ...]} по факторам"""
+    users = len(model.user_ids)
+    step = max(SCORE_BLOCK // max(len(model.title_ids), 1), 1)
+    parts = run(
+        score_users, chunks(users, step), workers,
+        {'users': model.user_factors, 'titles': model.title_factors,
+         'seen': model.ratings, 'size': size},
+    )
+    result = {}
+    row = 0
+    for titles, scores in parts:
+        finite = np.isfinite(scores)
+        title_ids = model.title_ids[titles].tolist()
+        predicted = np.clip(model.mean + scores, 1, 10).tolist()
+        for user_finite, user_titles, user_scores in zip(
+            finite.tolist(), title_ids, predicted
+        ):
+            result[int(model.user_ids[row])] = [
+                (title_id, score) for title_id, score, keep
+                in zip(user_titles, user_scores, user_finite) if keep
+            ]
+            row += 1
+    return result
+
+
+def recommend(ratings, size, workers=1, **options):
+    """Лучшие size непросмотренных произведений для каждого автора отзывов.
+
+    Возвращает {user_id: [(title_id, предсказанная оценка), ...]}.
+    """
+    if not ratings:
+        return {}
+    model = factorize(ratings, workers=workers, **options)
+    return top_titles(model, size, workers)
@@ -1,5 +1,6 @@
 import datetime
 
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.forms import ValidationError
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
@@ -23,7 +24,7 @@ class GenreSerializer(serializers.ModelSerializer):
 class TitleGetSerializer(serializers.ModelSerializer):
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         fields = (
@@ -77,6 +78,25 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
 
 
+class BulkUserSerializer(UserSerializer):
+    """Строка массового создания пользователей.
+
+    Уникальность username и email проверяется одним запросом на всю
+    пачку (api/provisioning.py), а не запросом на каждую строку.
+    """
+    username = serializers.CharField(
+        max_length=150, validators=[UnicodeUsernameValidator()]
+    )
+    email = serializers.EmailField(max_length=254)
+
+    def validate_username(self, value):
+        if value.lower() == 'me':
+            raise serializers.ValidationError(
+                'Создать пользователя с именем "me" не разрешено.'
+            )
+        return value
+
+
 class UserEditSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ('username', 'email', 'first_name',
@@ -100,6 +120,8 @@ class SignupSerializer(serializers.ModelSerializer):
 
 
 class TokenSerializer(serializers.ModelSerializer):
+    # без валидатора уникальности: токен выдается существующему пользователю
+    username = serializers.CharField(required=True)
     confirmation_code = serializers.CharField(required=True)
 
     class Meta:
@@ -0,0 +1,233 @@
+import threading
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from api import suggest, trending
+from api.tokens import CLAIM_FIELDS, revoke_claims
+from api.user_cache import users
+from api.cache import invalidate
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+# Группы кеша ответов:
+# catalog - списки категорий и жанров, вложенные в произведения;
+# titles - списки произведений (включают рейтинг);
+# title:<id> - карточка произведения;
+# top, similar - списки лучших и похожих произведений (сбрасываются
+# и командами rebuild_top_titles, rebuild_similar_titles);
+# reviews:<title_id>, comments:<review_id> - отзывы и комментарии;
+# authors - имена авторов в отзывах и комментариях.
+
+
+@receiver((post_save, post_delete), sender=Category)
+@receiver((post_save, post_delete), sender=Genre)
+def invalidate_catalog(sender, **kwargs):
+    invalidate('catalog')
+
+
+@receiver((post_save, post_delete), sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    invalidate('titles', 'top', 'similar', f'title:{instance.id}')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, **kwargs):
+    if isinstance(instance, Title):
+        invalidate('titles', 'top', 'similar', f'title:{instance.id}')
+    else:
+        invalidate('catalog')
+
+
+class Deleting(threading.local):
+    """Произведения и авторы, которые удаляются в текущем потоке.
+
+    Каскадное удаление их отзывов не сдвигает агрегаты по одному отзыву:
+    агрегаты удаляемого произведения не нужны, а отзывы автора
+    вычитаются одним сгруппированным запросом до удаления.
+    """
+
+    def __init__(self):
+        self.titles = set()
+        self.authors = set()
+
+    def clear(self):
+        self.titles.clear()
+        self.authors.clear()
+
+
+deleting = Deleting()
+
+
+@receiver(request_started)
+def forget_deleting(sender, **kwargs):
+    # отметки удаления, прерванного исключением
+    deleting.clear()
+
+
+@receiver(pre_delete, sender=Title)
+def title_deleting(sender, instance, **kwargs):
+    deleting.titles.add(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    deleting.titles.discard(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def author_deleting(sender, instance, **kwargs):
+    Title.objects.subtract_reviews(
+        Review.objects.filter(author_id=instance.pk)
+    )
+    deleting.authors.add(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def author_deleted(sender, instance, **kwargs):
+    deleting.authors.discard(instance.pk)
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    instance._stored_score = None if instance.pk is None else (
+        Review.objects.filter(pk=instance.pk)
+        .values_list('score', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Review)
+def review_saved_aggregates(sender, instance, created, **kwargs):
+    # Агрегаты сдвигаются при любом сохранении и удалении отзыва,
+    # а не только из API; каскадные удаления - см. Deleting
+    if created:
+        Title.objects.apply_review_delta(instance.title_id, instance.score, 1)
+    elif instance._stored_score is not None and (
+        instance._stored_score != instance.score
+    ):
+        Title.objects.apply_review_delta(
+            instance.title_id, instance.score - instance._stored_score, 0
+        )
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted_aggregates(sender, instance, **kwargs):
+    if (
+        instance.title_id in deleting.titles
+        or instance.author_id in deleting.authors
+    ):
+        return
+    Title.objects.apply_review_delta(instance.title_id, -instance.score, -1)
+
+
+@receiver((post_save, post_delete), sender=Review)
+def invalidate_review(sender, instance, **kwargs):
+    invalidate(
+        'titles',
+        f'title:{instance.title_id}',
+        f'reviews:{instance.title_id}',
+    )
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    invalidate(f'comments:{instance.review_id}')
+
+
+@receiver(post_save, sender=Title)
+def suggest_title(sender, instance, **kwargs):
+    suggest.index.put(suggest.title_entry(
+        instance.id, instance.name, instance.review_count
+    ))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def suggest_slug_model(sender, instance, **kwargs):
+    kind = sender._meta.model_name
+    suggest.index.put(suggest.slug_entry(
+        kind, instance.id, instance.slug, instance.name,
+        suggest.index.weight((kind, instance.id))
+    ))
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def suggest_remove(sender, instance, **kwargs):
+    suggest.index.remove((sender._meta.model_name, instance.id))
+
+
+@receiver(post_save, sender=Review)
+def suggest_review_created(sender, instance, created, **kwargs):
+    if created:
+        suggest.index.add_weight(('title', instance.title_id), 1)
+
+
+@receiver(post_delete, sender=Review)
+def suggest_review_deleted(sender, instance, **kwargs):
+    suggest.index.add_weight(('title', instance.title_id), -1)
+
+
+@receiver(post_save, sender=Review)
+def trending_review(sender, instance, created, **kwargs):
+    if created:
+        trending.record(
+            instance.title_id, settings.TRENDING_REVIEW_WEIGHT,
+            instance.pub_date
+        )
+
+
+@receiver(post_save, sender=Comment)
+def trending_comment(sender, instance, created, **kwargs):
+    if created:
+        trending.record(
+            instance.review.title_id, settings.TRENDING_COMMENT_WEIGHT,
+            instance.pub_date
+        )
+
+
+@receiver(post_delete, sender=Title)
+def trending_remove(sender, instance, **kwargs):
+    trending.heap.remove(instance.id)
+
+
+def revoke_user(user_id):
+    # Повтор после коммита: чтение, начатое до коммита, не должно
+    # считаться свежее отметки
+    revoke_claims(user_id)
+    users.invalidate(user_id)
+
+    def after_commit():
+        revoke_claims(user_id)
+        users.invalidate(user_id)
+    transaction.on_commit(after_commit)
+
+
+@receiver(pre_save, sender=User)
+def revoke_changed_claims(sender, instance, **kwargs):
+    if instance.pk is None:
+        return
+    stored = User.objects.filter(pk=instance.pk).values(
+        'is_active', *CLAIM_FIELDS
+    ).first()
+    if stored is None:
+        return
+    if any(stored[field] != getattr(instance, field) for field in stored):
+        revoke_user(instance.pk)
+    if stored['username'] != instance.username:
+        invalidate('authors')
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    users.invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_claims(sender, instance, **kwargs):
+    revoke_user(instance.pk)
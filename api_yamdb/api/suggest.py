@@ -0,0 +1,162 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Count
+
+from reviews.models import Category, Genre, Title
+
+# Сколько последних ответов по префиксам держать до следующего изменения
+CACHED_PREFIXES = 4096
+
+
+def normalize(text):
+    return text.lower().replace('ё', 'е')
+
+
+def word_suffixes(name):
+    """Хвосты названия от начала каждого слова: «из шоушенка», «шоушенка»"""
+    text = normalize(name)
+    return {
+        text[position:] for position, char in enumerate(text)
+        if not char.isspace()
+        and (position == 0 or text[position - 1].isspace())
+    }
+
+
+class PrefixIndex:
+    """Отсортированный массив ключей для подсказок без запросов к БД.
+
+    Ключ — хвост названия от начала слова, поэтому префикс находится
+    бинарным поиском, а подсказки выбираются по весу (числу отзывов).
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        self.keys = []
+        self.entries = {}
+        self.top = OrderedDict()
+        self.built_at = None
+
+    def build(self, entries):
+        keys = []
+        by_key = {}
+        for entry in entries:
+            by_key[entry['key']] = entry
+            keys.extend(
+                (suffix, entry['key'])
+                for suffix in word_suffixes(entry['name'])
+            )
+        keys.sort()
+        with self.lock:
+            self.keys, self.entries = keys, by_key
+            self.top.clear()
+            self.built_at = time.monotonic()
+
+    def is_stale(self):
+        return (
+            self.built_at is None
+            or time.monotonic() - self.built_at > settings.SUGGEST_INDEX_TTL
+        )
+
+    def put(self, entry):
+        with self.lock:
+            if self.built_at is None:
+                return
+            self.remove(entry['key'])
+            self.entries[entry['key']] = entry
+            for suffix in word_suffixes(entry['name']):
+                insort(self.keys, (suffix, entry['key']))
+            self.top.clear()
+
+    def remove(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return
+            for suffix in word_suffixes(entry['name']):
+                position = bisect_left(self.keys, (suffix, key))
+                if self.keys[position:position + 1] == [(suffix, key)]:
+                    del self.keys[position]
+            self.top.clear()
+
+    def weight(self, key):
+        entry = self.entries.get(key)
+        return entry['weight'] if entry else 0
+
+    def add_weight(self, key, delta):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry['weight'] += delta
+                self.top.clear()
+
+    def search(self, prefix, limit):
+        prefix = normalize(prefix).strip()
+        if not prefix:
+            return []
+        with self.lock:
+            cached = self.top.get((prefix, limit))
+            if cached is not None:
+                self.top.move_to_end((prefix, limit))
+                return cached
+            low = bisect_left(self.keys, (prefix,))
+            high = bisect_left(self.keys, (prefix + '\uffff',), low)
+            found = {key for _, key in self.keys[low:high]}
+            result = heapq.nsmallest(
+                limit,
+                (self.entries[key] for key in found),
+                key=lambda entry: (-entry['weight'], entry['name']),
+            )
+            self.top[(prefix, limit)] = result
+            if len(self.top) > CACHED_PREFIXES:
+                self.top.popitem(last=False)
+            return result
+
+
+index = PrefixIndex()
+
+
+def title_entry(title_id, name, weight):
+    return {'key': ('title', title_id), 'type': 'title', 'id': title_id,
+            'name': name, 'weight': weight}
+
+
+def slug_entry(kind, pk, slug, name, weight):
+    return {'key': (kind, pk), 'type': kind, 'slug': slug,
+            'name': name, 'weight': weight}
+
+
+def load_entries():
+    titles = Title.objects.values_list('id', 'name', 'review_count')
+    for title_id, name, review_count in titles.iterator():
+        yield title_entry(title_id, name, review_count)
+    for model, kind in ((Genre, 'genre'), (Category, 'category')):
+        rows = model.objects.annotate(
+            weight=Count('title')
+        ).values_list('id', 'slug', 'name', 'weight')
+        for pk, slug, name, weight in rows:
+            yield slug_entry(kind, pk, slug, name, weight)
+
+
+def suggestions(prefix, limit):
+    """Подсказки по префиксу.
+
+    Индекс строится при первом обращении и пересобирается раз в
+    SUGGEST_INDEX_TTL секунд, чтобы подтянуть изменения других процессов.
+    """
+    if index.is_stale():
+        index.build(load_entries())
+    return [
+        {
+            field: value for field, value in entry.items()
+            if field not in ('key', 'weight')
+        }
+        for entry in index.search(prefix, limit)
+    ]
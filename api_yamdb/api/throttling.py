@@ -0,0 +1,123 @@
+"""Ограничение частоты запросов регистрации и получения токена.
+
+Каждый ключ (адрес клиента, имя пользователя, email) - токен-бакет
+емкостью N запросов из ставки 'N/период', который пополняется
+на один запрос каждые период / N секунд. Состояние ключа - пара
+(токены, время) в кеше THROTTLE_CACHE_ALIAS, поэтому проверка стоит
+одно чтение и одну запись кеша независимо от ставки (история запросов
+SimpleRateThrottle растет со ставкой).
+"""
+import hashlib
+import math
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from api.metrics import THROTTLED
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Токен-бакет по ставке DEFAULT_THROTTLE_RATES[scope].
+
+    Запрос проходит, если во всех его бакетах есть токен, и тогда
+    списывает по токену из каждого. Чтение и запись бакета не атомарны:
+    при одновременных запросах из нескольких воркеров лимит может быть
+    превышен на число таких запросов.
+    """
+
+    def get_rate(self):
+        # ставка читается при создании троттла, а не при импорте модуля
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE_ALIAS]
+
+    def get_cache_keys(self, request, view):
+        raise NotImplementedError('.get_cache_keys() must be overridden')
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        keys = self.get_cache_keys(request, view)
+        if not keys:
+            return True
+        now = self.timer()
+        interval = self.duration / self.num_requests
+        cache = self.cache
+        buckets = cache.get_many(keys)
+        levels = {}
+        for key in keys:
+            tokens, updated_at = buckets.get(key, (self.num_requests, now))
+            tokens = min(
+                self.num_requests, tokens + (now - updated_at) / interval
+            )
+            if tokens < 1:
+                self.retry_after = (1 - tokens) * interval
+                THROTTLED.labels(self.scope).inc()
+                return False
+            levels[key] = (tokens - 1, now)
+        # пустой бакет снова полон через duration, дальше ключ не нужен
+        cache.set_many(levels, self.duration)
+        return True
+
+    def wait(self):
+        # DRF отбрасывает дробную часть Retry-After, поэтому вверх
+        return math.ceil(self.retry_after)
+
+
+class AddressThrottle(TokenBucketThrottle):
+    """Бакет на адрес клиента.
+
+    X-Forwarded-For учитывается только при NUM_PROXIES > 0: иначе клиент
+    обходит лимит, подставляя в заголовок новый адрес на каждый запрос.
+    """
+
+    def get_cache_keys(self, request, view):
+        return [self.cache_format % {
+            'scope': self.scope, 'ident': self.get_ident(request),
+        }]
+
+
+class IdentityThrottle(TokenBucketThrottle):
+    """Бакет на каждое из полей fields в теле запроса"""
+    fields = ()
+
+    def get_cache_keys(self, request, view):
+        keys = []
+        if not isinstance(request.data, Mapping):
+            # тело не объект - запрос отклонит сериализатор
+            return keys
+        for field in self.fields:
+            value = request.data.get(field)
+            if not isinstance(value, str) or not value.strip():
+                continue
+            # произвольный ввод не годится в ключ memcached как есть
+            ident = hashlib.md5(
+                value.strip().lower().encode()
+            ).hexdigest()
+            keys.append(self.cache_format % {
+                'scope': self.scope, 'ident': f'{field}_{ident}',
+            })
+        return keys
+
+
+class SignupAddressThrottle(AddressThrottle):
+    scope = 'signup'
+
+
+class SignupIdentityThrottle(IdentityThrottle):
+    scope = 'signup_identity'
+    fields = ('username', 'email')
+
+
+class TokenAddressThrottle(AddressThrottle):
+    scope = 'token'
+
+
+class TokenIdentityThrottle(IdentityThrottle):
+    scope = 'token_identity'
+    fields = ('username',)
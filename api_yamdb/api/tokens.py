@@ -0,0 +1,136 @@
+"""Токены доступа с claims роли и аутентификация без запроса к БД.
+
+Модуль подключается в DEFAULT_AUTHENTICATION_CLASSES, поэтому
+не импортирует rest_framework.views и модули, которые от него зависят.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.shortcuts import get_object_or_404
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.user_cache import users
+from users.models import User
+
+# Поля пользователя, которые попадают в токен
+CLAIM_FIELDS = ('username', 'role', 'is_superuser')
+# Бэкенды кеша, содержимое которых видно только своему процессу
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def issue_token(user):
+    """Токен доступа с ролью пользователя в claims"""
+    token = AccessToken.for_user(user)
+    for field in CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+    token['iat'] = int(time.time())
+    return token
+
+
+def revocation_cache():
+    return caches[settings.JWT_REVOCATION_CACHE_ALIAS]
+
+
+def revocations_shared():
+    """Видны ли отметки revoke_claims всем воркерам"""
+    return not isinstance(revocation_cache(), PROCESS_LOCAL_CACHES)
+
+
+def revocation_key(user_id):
+    return f'jwt-revoked:{user_id}'
+
+
+def revoke_claims(user_id):
+    """Не доверять claims токенов, выданных пользователю до этого момента"""
+    revocation_cache().set(
+        revocation_key(user_id), time.time(),
+        api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    )
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь из claims токена или кеша, без запроса к БД"""
+
+    @property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN
+
+    @property
+    def is_privileged(self):
+        return self.is_superuser or self.role in (User.MODERATOR, User.ADMIN)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT аутентификация, которая на чтении не загружает пользователя.
+
+    Для безопасных методов пользователь строится из claims токена,
+    выданного issue_token(), а для токенов без claims или выданных до
+    смены роли или удаления пользователя (см. revoke_claims) - из кеша
+    api/user_cache.py. Изменяющие запросы получают модель User из БД.
+
+    Если кеш отметок об отзыве локален для процесса, понижение роли
+    в другом воркере здесь не видно, поэтому права модератора
+    и администратора на чтении тоже проверяются по БД.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        if request.method not in SAFE_METHODS:
+            return self.get_user(validated_token), validated_token
+        identity = self.get_identity(validated_token)
+        if identity.is_privileged and not revocations_shared():
+            return self.get_user(validated_token), validated_token
+        return identity, validated_token
+
+    def get_identity(self, token):
+        if api_settings.USER_ID_CLAIM not in token:
+            raise InvalidToken('Токен не содержит идентификатор пользователя')
+        user_id = token[api_settings.USER_ID_CLAIM]
+        revoked_at = revocation_cache().get(revocation_key(user_id))
+        if all(field in token for field in ('iat', *CLAIM_FIELDS)) and (
+            revoked_at is None or token['iat'] > revoked_at
+        ):
+            return ClaimsUser(token)
+        identity = users.get(user_id, not_before=revoked_at)
+        if identity is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден', code='user_not_found'
+            )
+        if not identity['is_active']:
+            raise AuthenticationFailed(
+                'Пользователь неактивен', code='user_inactive'
+            )
+        return ClaimsUser({
+            api_settings.USER_ID_CLAIM: user_id,
+            **{field: identity[field] for field in CLAIM_FIELDS},
+        })
+
+
+def full_user(user):
+    """Модель пользователя для request.user из claims"""
+    if isinstance(user, User):
+        return user
+    return get_object_or_404(User, pk=user.pk)
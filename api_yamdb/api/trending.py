@@ -0,0 +1,121 @@
+import heapq
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from reviews.models import TitleTrend
+
+
+def decay_rate():
+    return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+
+def add_heat(heat, weight, moment):
+    """heat после события веса weight в момент moment.
+
+    ln(e^heat + weight * e^(λt)) без вычисления самих экспонент,
+    которые переполнились бы через пару тысяч периодов полураспада.
+    """
+    event = math.log(weight) + decay_rate() * moment.timestamp()
+    if heat is None:
+        return event
+    high, low = max(heat, event), min(heat, event)
+    return high + math.log1p(math.exp(low - high))
+
+
+def current_score(heat, now):
+    """Затухшая к моменту now сумма весов событий"""
+    return math.exp(heat - decay_rate() * now.timestamp())
+
+
+class TrendingHeap:
+    """Ограниченная куча произведений с наибольшим heat.
+
+    heat меняется только при событиях, поэтому произведение вне кучи
+    может попасть в нее только через push. Устаревшие записи кучи
+    после обновления heat удаляются лениво.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        self.heat = {}
+        self.heap = []
+        self.loaded_at = None
+
+    def load(self, rows):
+        with self.lock:
+            self.heat = dict(rows)
+            self.heap = [(heat, pk) for pk, heat in self.heat.items()]
+            heapq.heapify(self.heap)
+            self.loaded_at = time.monotonic()
+
+    def is_stale(self):
+        return (
+            self.loaded_at is None
+            or time.monotonic() - self.loaded_at
+            > settings.TRENDING_RELOAD_INTERVAL
+        )
+
+    def compact(self):
+        while self.heap and self.heat.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        if len(self.heap) > 2 * settings.TRENDING_HEAP_SIZE:
+            self.heap = [(heat, pk) for pk, heat in self.heat.items()]
+            heapq.heapify(self.heap)
+
+    def push(self, title_id, heat):
+        with self.lock:
+            if self.loaded_at is None:
+                return
+            if (title_id not in self.heat
+                    and len(self.heat) >= settings.TRENDING_HEAP_SIZE):
+                self.compact()
+                if heat <= self.heap[0][0]:
+                    return
+                _, evicted = heapq.heappop(self.heap)
+                del self.heat[evicted]
+            self.heat[title_id] = heat
+            heapq.heappush(self.heap, (heat, title_id))
+
+    def remove(self, title_id):
+        with self.lock:
+            self.heat.pop(title_id, None)
+
+    def top(self, limit):
+        with self.lock:
+            return heapq.nlargest(
+                limit, self.heat.items(), key=lambda item: item[1]
+            )
+
+
+heap = TrendingHeap()
+
+
+def record(title_id, weight, moment):
+    """Учесть событие: одна строка TitleTrend и куча после коммита"""
+    with transaction.atomic():
+        trend, created = TitleTrend.objects.select_for_update().get_or_create(
+            title_id=title_id,
+            defaults={'heat': add_heat(None, weight, moment)},
+        )
+        if not created:
+            trend.heat = add_heat(trend.heat, weight, moment)
+            trend.save(update_fields=['heat'])
+    transaction.on_commit(lambda: heap.push(title_id, trend.heat))
+
+
+def top_trending(limit):
+    """Пары (title_id, heat) по убыванию активности"""
+    if heap.is_stale():
+        heap.load(
+            TitleTrend.objects.order_by('-heat').values_list(
+                'title_id', 'heat'
+            )[:settings.TRENDING_HEAP_SIZE]
+        )
+    return heap.top(limit)
@@ -2,8 +2,9 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       ReviewViewSet, TitleViewSet, UserViewSet)
+                       ReviewViewSet, TitleViewSet, UserViewSet, suggest)
 from api.authentication import signup, token
+from api.metrics import metrics
 
 router = DefaultRouter()
 
@@ -20,5 +21,7 @@ router.register(
 urlpatterns = [
     path('v1/', include(router.urls)),
     path('v1/auth/signup/', signup, name='signup'),
-    path('v1/auth/token/', token, name='token')
+    path('v1/auth/token/', token, name='token'),
+    path('v1/suggest/', suggest, name='suggest'),
+    path('metrics', metrics, name='metrics'),
 ]
@@ -0,0 +1,58 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from api.metrics import USER_CACHE
+from users.models import User
+
+IDENTITY_FIELDS = ('username', 'role', 'is_superuser', 'is_active')
+
+
+class UserCache:
+    """LRU кеш имени и роли пользователей по id в памяти процесса.
+
+    Записи сбрасываются сигналами User в этом процессе; изменения
+    в других процессах видны через отметку отзыва claims (not_before),
+    после которой запись перечитывается.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.entries = OrderedDict()
+
+    def get(self, user_id, not_before=None):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and (
+                not_before is None or entry['loaded_at'] > not_before
+            ):
+                self.entries.move_to_end(user_id)
+                USER_CACHE.labels('hit').inc()
+                return entry
+        USER_CACHE.labels('miss').inc()
+        loaded_at = time.time()
+        entry = User.objects.filter(pk=user_id).values(
+            *IDENTITY_FIELDS
+        ).first()
+        with self.lock:
+            if entry is None:
+                self.entries.pop(user_id, None)
+                return None
+            entry['loaded_at'] = loaded_at
+            self.entries[user_id] = entry
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > settings.USER_CACHE_SIZE:
+                self.entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+
+users = UserCache()
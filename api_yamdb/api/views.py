@@ -1,28 +1,75 @@
-from django.db.models import Avg
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
 from django.db.utils import IntegrityError
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
-from rest_framework.decorators import action
+from rest_framework.decorators import (action, api_view,
+                                       authentication_classes,
+                                       permission_classes)
 from rest_framework.exceptions import ParseError
 from rest_framework.generics import get_object_or_404
 from rest_framework.pagination import (LimitOffsetPagination,
                                        PageNumberPagination)
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, Recommendation, Review,
+                            SimilarTitle, Title, TopTitle)
 from users.models import User
-from .filters import TitleFilter
-from .mixins import ListCreateDestroyViewSet
+from .filters import TitleFilter, TitleSearchFilter, title_facets
+from .provisioning import provision_users
+from .suggest import suggestions
+from .trending import current_score, top_trending
+from .mixins import (CachedListMixin, CachedRetrieveMixin,
+                     ConditionalListMixin, ConditionalRetrieveMixin,
+                     ListCreateDestroyViewSet)
+from .pagination import KeysetPagination
+from .parsers import NDJSONParser
 from .permissions import (IsAdminOrReadOnly, IsRoleAdmin,
                           ReviewCommentCustomPermission)
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, ReviewSerializer,
                           TitleGetSerializer, TitlePostSerializer,
                           UserEditSerializer, UserSerializer)
+from .tokens import full_user
 
+SUGGEST_LIMIT = 10
+SUGGEST_MAX_LIMIT = 50
+TOP_TITLES_LIMIT = 10
+TRENDING_LIMIT = 10
+SIMILAR_TITLES_LIMIT = 10
+RECOMMENDATIONS_LIMIT = 10
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+
+def genres_prefetch(lookup='genre'):
+    return Prefetch(
+        lookup, queryset=Genre.objects.only('name', 'slug').order_by('slug')
+    )
+
+
+def ranked_titles(pairs, field, digits):
+    """Ответ со списком произведений и значением field у каждого"""
+    results = []
+    for title, value in pairs:
+        data = TitleGetSerializer(title).data
+        data[field] = round(value, digits)
+        results.append(data)
+    return Response({'results': results})
+
+
+def limit_param(request, default, maximum):
+    try:
+        limit = int(request.query_params.get('limit', default))
+    except ValueError:
+        raise ParseError('limit должен быть целым числом')
+    return min(max(limit, 1), maximum)
+
+
+class CategoryViewSet(ConditionalListMixin, CachedListMixin,
+                      ListCreateDestroyViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -31,8 +78,12 @@ class CategoryViewSet(ListCreateDestroyViewSet):
     search_fields = ('name',)
     lookup_field = 'slug'
 
+    def get_cache_groups(self):
+        return ('catalog',)
+
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class GenreViewSet(ConditionalListMixin, CachedListMixin,
+                   ListCreateDestroyViewSet):
     queryset = Genre.objects.all()
     permission_classes = (IsAdminOrReadOnly,)
     serializer_class = GenreSerializer
@@ -41,13 +92,119 @@ class GenreViewSet(ListCreateDestroyViewSet):
     search_fields = ('name',)
     lookup_field = 'slug'
 
+    def get_cache_groups(self):
+        return ('catalog',)
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
+
+class TitleViewSet(ConditionalListMixin, ConditionalRetrieveMixin,
+                   CachedListMixin, CachedRetrieveMixin,
+                   viewsets.ModelViewSet):
+    last_modified_fields = (
+        'updated_at', 'category__updated_at', 'genre__updated_at'
+    )
+    queryset = Title.objects.select_related('category').prefetch_related(
+        genres_prefetch()
+    )
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = LimitOffsetPagination
-    filter_backends = (DjangoFilterBackend,)
+    pagination_class = KeysetPagination
+    keyset_ordering = ('id',)
+    filter_backends = (
+        DjangoFilterBackend, TitleSearchFilter, filters.OrderingFilter
+    )
     filterset_class = TitleFilter
+    ordering_fields = ('rating', 'year', 'review_count', 'name')
+
+    def get_cache_groups(self):
+        if self.action == 'retrieve':
+            return ('catalog', f'title:{self.kwargs["pk"]}')
+        if self.action in ('top', 'similar'):
+            return ('catalog', self.action)
+        return ('catalog', 'titles')
+
+    @action(detail=False, url_path='top')
+    def top(self, request):
+        """Лучшие по взвешенному рейтингу: все, `?category=` или `?genre=`.
+
+        Списки предрассчитаны командой rebuild_top_titles, отзывы
+        при запросе не читаются.
+        """
+        return self.cached_response(self.top_titles, request)
+
+    def top_titles(self, request):
+        category = request.query_params.get('category')
+        genre = request.query_params.get('genre')
+        if category and genre:
+            raise ParseError('Укажите только category или только genre')
+        scope, scope_id = TopTitle.ALL, 0
+        if category:
+            scope = TopTitle.CATEGORY
+            scope_id = get_object_or_404(Category, slug=category).id
+        elif genre:
+            scope = TopTitle.GENRE
+            scope_id = get_object_or_404(Genre, slug=genre).id
+        limit = limit_param(
+            request, TOP_TITLES_LIMIT, settings.TOP_TITLES_SIZE
+        )
+        places = TopTitle.objects.filter(
+            scope=scope, scope_id=scope_id
+        ).order_by('position').select_related(
+            'title__category'
+        ).prefetch_related(genres_prefetch('title__genre'))[:limit]
+        return ranked_titles(
+            ((place.title, place.weighted_rating) for place in places),
+            'weighted_rating', 2
+        )
+
+    @action(detail=False, url_path='trending')
+    def trending(self, request):
+        """Популярное сейчас: затухающая активность отзывов и комментариев"""
+        limit = limit_param(
+            request, TRENDING_LIMIT, settings.TRENDING_HEAP_SIZE
+        )
+        ranked = top_trending(limit)
+        titles = self.get_queryset().in_bulk(
+            [title_id for title_id, _ in ranked]
+        )
+        now = timezone.now()
+        return ranked_titles(
+            (
+                (titles[title_id], current_score(heat, now))
+                for title_id, heat in ranked if title_id in titles
+            ),
+            'trend_score', 3
+        )
+
+    @action(detail=True, url_path='similar')
+    def similar(self, request, pk=None):
+        """Похожие произведения из таблицы rebuild_similar_titles"""
+        return self.cached_response(self.similar_titles, request, pk)
+
+    def similar_titles(self, request, pk):
+        get_object_or_404(Title.objects.only('id'), pk=pk)
+        limit = limit_param(
+            request, SIMILAR_TITLES_LIMIT, settings.SIMILAR_TITLES_SIZE
+        )
+        neighbors = SimilarTitle.objects.filter(
+            title_id=pk
+        ).order_by('position').select_related(
+            'similar__category'
+        ).prefetch_related(genres_prefetch('similar__genre'))[:limit]
+        return ranked_titles(
+            (
+                (neighbor.similar, neighbor.similarity)
+                for neighbor in neighbors
+            ),
+            'similarity', 3
+        )
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        facets = self.request.query_params.get('facets')
+        if facets:
+            response.data['facets'] = title_facets(
+                self.filter_queryset(self.get_queryset()), facets
+            )
+        return response
 
     def get_serializer_class(self):
         if self.request.method in ('POST', 'PATCH'):
@@ -73,7 +230,7 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer_class=UserEditSerializer,
     )
     def users_own_profile(self, request):
-        user = request.user
+        user = full_user(request.user)
         if request.method == 'GET':
             serializer = self.get_serializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -88,13 +245,72 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    @action(
+        methods=['POST'],
+        detail=False,
+        url_path='bulk',
+        parser_classes=(JSONParser, NDJSONParser),
+    )
+    def bulk_create(self, request):
+        """Создание пользователей из JSON массива или NDJSON.
+
+        С ?send_codes=true новым пользователям отправляются коды
+        подтверждения.
+        """
+        rows = request.data
+        if not isinstance(rows, list):
+            raise ParseError('Ожидается массив пользователей.')
+        if len(rows) > settings.USERS_BULK_MAX_ROWS:
+            raise ParseError(
+                f'Не больше {settings.USERS_BULK_MAX_ROWS} '
+                'пользователей за запрос.'
+            )
+        send_codes = request.query_params.get('send_codes') in (
+            'true', '1'
+        )
+        created, errors = provision_users(rows, send_codes)
+        return Response(
+            {'created': created, 'errors': errors},
+            status=status.HTTP_200_OK
+        )
+
+    @action(
+        detail=False,
+        url_path='me/recommendations',
+        permission_classes=(IsAuthenticated,),
+    )
+    def recommendations(self, request):
+        """Рекомендации из таблицы rebuild_recommendations"""
+        limit = limit_param(
+            request, RECOMMENDATIONS_LIMIT, settings.RECOMMENDATIONS_SIZE
+        )
+        recommended = Recommendation.objects.filter(
+            user_id=request.user.pk
+        ).order_by('position').select_related(
+            'title__category'
+        ).prefetch_related(genres_prefetch('title__genre'))[:limit]
+        return ranked_titles(
+            (
+                (recommendation.title, recommendation.predicted_score)
+                for recommendation in recommended
+            ),
+            'predicted_score', 2
+        )
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalListMixin, ConditionalRetrieveMixin,
+                    CachedListMixin, CachedRetrieveMixin,
+                    viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetPagination
     permission_classes = [ReviewCommentCustomPermission]
 
+    validator_groups = ('authors',)
+
+    def get_cache_groups(self):
+        return (f'reviews:{self.kwargs["titles_id"]}', 'authors')
+
     def get_queryset(self):
         title_id = self.kwargs['titles_id']
         return Review.objects.filter(title__id=title_id)
@@ -104,20 +320,37 @@ class ReviewViewSet(viewsets.ModelViewSet):
             title_id = self.kwargs['titles_id']
             title = get_object_or_404(Title, id=title_id)
             author = self.request.user
-            serializer.save(
-                author=author,
-                title=title,
-            )
+            # агрегаты произведения обновляет сигнал post_save (api/signals.py)
+            with transaction.atomic():
+                serializer.save(
+                    author=author,
+                    title=title,
+                )
         except IntegrityError:
             raise ParseError('Можно оставить только один отзыв')
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalListMixin, ConditionalRetrieveMixin,
+                     CachedListMixin, CachedRetrieveMixin,
+                     viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetPagination
     permission_classes = [ReviewCommentCustomPermission]
 
+    validator_groups = ('authors',)
+
+    def get_cache_groups(self):
+        return (f'comments:{self.kwargs["review_id"]}', 'authors')
+
     def get_queryset(self):
         review_id = self.kwargs['review_id']
         return Comment.objects.filter(review__id=review_id)
@@ -126,3 +359,13 @@ class CommentViewSet(viewsets.ModelViewSet):
         review_id = self.kwargs['review_id']
         review = get_object_or_404(Review, id=review_id)
         serializer.save(author=self.request.user, review=review)
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny, ])
+def suggest(request):
+    """Подсказки по префиксу из индекса в памяти процесса"""
+    limit = limit_param(request, SUGGEST_LIMIT, SUGGEST_MAX_LIMIT)
+    query = request.query_params.get('q', '')
+    return Response({'q': query, 'results': suggestions(query, limit)})
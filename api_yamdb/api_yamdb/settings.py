@@ -35,7 +35,18 @@ AUTH_USER_MODEL = 'users.User'
 EMAIL_HOST = 'localhost'
 EMAIL_PORT = 1025
 
+# Очередь писем (api/outbox.py): письма отправляет команда send_emails;
+# EMAIL_OUTBOX_EAGER отправляет их сразу после коммита в том же процессе.
+# Неудачная попытка повторяется через EMAIL_OUTBOX_BACKOFF * 2^(n - 1)
+# секунд, после EMAIL_OUTBOX_MAX_ATTEMPTS попыток письмо помечается failed.
+# Взятое воркером письмо не выдается другим EMAIL_OUTBOX_LEASE секунд.
+EMAIL_OUTBOX_EAGER = False
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_BACKOFF = 30
+EMAIL_OUTBOX_LEASE = 300
+
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -43,8 +54,33 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.QueryInstrumentationMiddleware',
 ]
 
+# Запросы дольше порога попадают в лог медленных запросов
+SLOW_REQUEST_THRESHOLD_MS = 500
+SLOW_REQUEST_LOG = os.path.join(BASE_DIR, 'slow_requests.log')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'slow_requests': {
+            'class': 'logging.FileHandler',
+            'filename': SLOW_REQUEST_LOG,
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'api.slow_requests': {
+            'handlers': ['slow_requests'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -77,6 +113,55 @@ DATABASES = {
 }
 
 
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Кеш ответов на чтение; при нескольких воркерах нужен общий бэкенд,
+# например 'django.core.cache.backends.filebased.FileBasedCache'
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Индекс подсказок живет в памяти процесса и полностью пересобирается
+# с этим периодом (секунды), чтобы подтянуть изменения других воркеров
+SUGGEST_INDEX_TTL = 600
+
+# Лучшие произведения по взвешенному рейтингу
+# (score_sum + m * C) / (review_count + m): m - вес априорной оценки
+# в отзывах, C - априорная оценка (None - средняя по всем отзывам).
+# Таблица пересобирается командой rebuild_top_titles, TOP_TITLES_SIZE -
+# сколько мест хранить для каждого списка
+TOP_TITLES_PRIOR_WEIGHT = 10
+TOP_TITLES_PRIOR_MEAN = None
+TOP_TITLES_SIZE = 100
+
+# Популярное сейчас: вклад отзыва и комментария затухает вдвое за
+# TRENDING_HALF_LIFE_HOURS; в памяти процесса держится TRENDING_HEAP_SIZE
+# лучших, которые перечитываются из БД раз в TRENDING_RELOAD_INTERVAL
+# секунд, чтобы подтянуть события других воркеров
+TRENDING_HALF_LIFE_HOURS = 24
+TRENDING_REVIEW_WEIGHT = 1.0
+TRENDING_COMMENT_WEIGHT = 0.5
+TRENDING_HEAP_SIZE = 100
+TRENDING_RELOAD_INTERVAL = 60
+
+# Похожие произведения: доля сходства по жанрам (Жаккар) в смеси
+# с косинусной близостью оценок; хранится SIMILAR_TITLES_SIZE соседей
+SIMILAR_TITLES_GENRE_WEIGHT = 0.5
+SIMILAR_TITLES_SIZE = 20
+
+# Рекомендации: сколько произведений хранить на пользователя
+RECOMMENDATIONS_SIZE = 20
+
+# Предел строк в POST /api/v1/users/bulk/: проверка уникальности идет
+# одним запросом с двумя параметрами на строку
+USERS_BULK_MAX_ROWS = 5000
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -119,14 +204,42 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.tokens.StatelessJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.'
                                 'PageNumberPagination',
     'PAGE_SIZE': 10,
+    # Число доверенных прокси перед приложением: адрес клиента для
+    # ограничения частоты берется из X-Forwarded-For на этой глубине.
+    # 0 - только REMOTE_ADDR; при балансировщике укажите число прокси
+    'NUM_PROXIES': 0,
+    # Токен-бакеты регистрации и получения токена (api/throttling.py):
+    # 'N/период' - до N запросов подряд, дальше один за период / N
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '20/hour',
+        'signup_identity': '5/hour',
+        'token': '60/hour',
+        'token_identity': '10/hour',
+    },
 }
 
+# Кеш токен-бакетов; locmem считает запросы отдельно в каждом воркере,
+# общий счет дают общий для воркеров memcached или FileBasedCache
+# (последний заметно медленнее: около 1 мс на проверку против десятков
+# микросекунд у locmem, см. команду benchmark_throttle)
+THROTTLE_CACHE_ALIAS = 'default'
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
+
+# Кеш отметок об отзыве claims токенов (смена роли, удаление пользователя).
+# С локальным для процесса бэкендом (locmem) отметка не видна другим
+# воркерам, поэтому claims доверяются только для роли user, а модераторы
+# и администраторы читаются из БД; общий бэкенд (memcached,
+# FileBasedCache) позволяет доверять claims всех ролей
+JWT_REVOCATION_CACHE_ALIAS = 'default'
+
+# Сколько пользователей держать в LRU кеше имени и роли (api/user_cache.py)
+USER_CACHE_SIZE = 10000
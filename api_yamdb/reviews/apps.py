@@ -1,5 +1,16 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def install_title_fts(sender, using, **kwargs):
+    from reviews import fts
+
+    fts.install(connections[using])
 
 
 class ReviewsConfig(AppConfig):
     name = 'reviews'
+
+    def ready(self):
+        post_migrate.connect(install_title_fts, sender=self)
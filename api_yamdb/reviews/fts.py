@@ -0,0 +1,118 @@
+"""Полнотекстовый индекс FTS5 по названию и описанию произведений.
+
+Индекс бесконтентный: в него пишутся нормализованные значения, а
+синхронизацию с reviews_title ведут триггеры, поэтому bulk_create и
+update() тоже попадают в индекс. SQLite пересоздает таблицу при
+изменении схемы и теряет триггеры, поэтому install() вызывается
+после каждой миграции и при необходимости перестраивает индекс.
+"""
+from django.db.utils import OperationalError
+
+FTS_TABLE = 'reviews_title_fts'
+TRIGGERS = (f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au')
+
+# Наличие индекса по имени базы, чтобы не спрашивать схему на каждый запрос
+_installed = {}
+
+
+def normalize(column):
+    # unicode61 не сводит «ё» к «е», делаем это при индексации
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def values(row):
+    description = normalize(f"coalesce({row}description, '')")
+    return f"{normalize(f'{row}name')}, {description}"
+
+
+INSERT_NEW = (
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+    f"VALUES (new.id, {values('new.')});"
+)
+DELETE_OLD = (
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    f"VALUES ('delete', old.id, {values('old.')});"
+)
+CREATE_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, description, content='', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+CREATE_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS {TRIGGERS[0]} AFTER INSERT "
+    f"ON reviews_title BEGIN {INSERT_NEW} END",
+    f"CREATE TRIGGER IF NOT EXISTS {TRIGGERS[1]} AFTER DELETE "
+    f"ON reviews_title BEGIN {DELETE_OLD} END",
+    f"CREATE TRIGGER IF NOT EXISTS {TRIGGERS[2]} AFTER UPDATE "
+    f"OF name, description ON reviews_title "
+    f"BEGIN {DELETE_OLD} {INSERT_NEW} END",
+)
+REBUILD = (
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')",
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+    f"SELECT id, {values('')} FROM reviews_title",
+)
+DROP = tuple(
+    f'DROP TRIGGER IF EXISTS {trigger}' for trigger in TRIGGERS
+) + (f'DROP TABLE IF EXISTS {FTS_TABLE}',)
+
+
+def fts5_supported(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                'CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe '
+                'USING fts5(value)'
+            )
+        except OperationalError:
+            return False
+        cursor.execute('DROP TABLE temp.fts5_probe')
+    return True
+
+
+def install(connection):
+    """Создает индекс и триггеры, если их нет; True, если индекс есть"""
+    if not fts5_supported(connection):
+        return False
+    with connection.cursor() as cursor:
+        if 'reviews_title' not in connection.introspection.table_names(
+            cursor
+        ):
+            return False
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master "
+            "WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+            TRIGGERS
+        )
+        triggers_in_place = cursor.fetchone()[0] == len(TRIGGERS)
+        cursor.execute(CREATE_TABLE)
+        for sql in CREATE_TRIGGERS:
+            cursor.execute(sql)
+        if not triggers_in_place:
+            for sql in REBUILD:
+                cursor.execute(sql)
+    _installed[connection.settings_dict['NAME']] = True
+    return True
+
+
+def uninstall(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for sql in DROP:
+            cursor.execute(sql)
+    _installed.pop(connection.settings_dict['NAME'], None)
+
+
+def is_installed(connection):
+    """Есть ли индекс в базе; результат запоминается для базы"""
+    if connection.vendor != 'sqlite':
+        return False
+    name = connection.settings_dict['NAME']
+    if name not in _installed:
+        _installed[name] = (
+            FTS_TABLE in connection.introspection.table_names()
+        )
+    return _installed[name]
@@ -0,0 +1,58 @@
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.admin.models import LogEntry
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from users.models import User
+
+
+def batches(iterable, size):
+    """Разбивает поток объектов на списки длиной не больше size"""
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Не затирать переданные даты текущим временем при bulk_create"""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def truncate_tables(models):
+    """Очищает таблицы моделей одной пачкой SQL, без каскада ORM"""
+    tables = []
+    if User in models:
+        tables.append(LogEntry._meta.db_table)
+        tables += [
+            field.remote_field.through._meta.db_table
+            for field in User._meta.many_to_many
+        ]
+    tables += [model._meta.db_table for model in models]
+    with transaction.atomic(), connection.cursor() as cursor:
+        for sql in connection.ops.sql_flush(no_style(), tables, ()):
+            cursor.execute(sql)
+    return tables
+
+
+def reset_sequences(model):
+    """Сдвигает счетчик id после вставки строк с явными id"""
+    sequence_sql = connection.ops.sequence_reset_sql(no_style(), [model])
+    if sequence_sql:
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
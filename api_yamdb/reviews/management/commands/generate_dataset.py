@@ -0,0 +1,230 @@
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from reviews.management.bulk import (batches, keep_auto_now_add,
+                                     reset_sequences, truncate_tables)
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+WORDS = (
+    'сюжет', 'герой', 'финал', 'атмосфера', 'музыка', 'актеры', 'автор',
+    'скучно', 'отлично', 'неожиданно', 'сильно', 'слабо', 'красиво',
+    'рекомендую', 'пересмотрю', 'перечитаю', 'затянуто', 'шедевр',
+    'середина', 'диалоги', 'темп', 'глубина', 'идея', 'мир', 'образ',
+)
+PUB_DATE_SPAN = timedelta(days=5 * 365)
+
+
+def zipf_weights(size, exponent):
+    return [1 / rank ** exponent for rank in range(1, size + 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетический набор данных заданного объема '
+        'для нагрузочного тестирования'
+    )
+
+    def add_arguments(self, parser):
+        volumes = (
+            ('--users', 1000, 'Количество пользователей'),
+            ('--categories', 10, 'Количество категорий'),
+            ('--genres', 30, 'Количество жанров'),
+            ('--titles', 1000, 'Количество произведений'),
+            ('--reviews', 20000, 'Количество отзывов'),
+            ('--comments', 40000, 'Количество комментариев'),
+        )
+        for name, default, help_text in volumes:
+            parser.add_argument(name, type=int, default=default,
+                                help=help_text)
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель распределения Ципфа популярности произведений',
+        )
+        parser.add_argument(
+            '--comment-skew', type=float, default=3.0,
+            help='Концентрация комментариев на первых отзывах',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--truncate', action='store_true',
+            help='Очистить таблицы перед генерацией',
+        )
+
+    def handle(self, *args, **options):
+        for name in ('users', 'categories', 'genres', 'titles'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} должен быть положительным')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        if options['truncate']:
+            truncate_tables([Comment, Review, Title.genre.through, Title,
+                             Genre, Category, User])
+        started = time.monotonic()
+        user_ids = self.create_users(options['users'])
+        category_ids = self.create_named(Category, options['categories'])
+        genre_ids = self.create_named(Genre, options['genres'])
+        title_ids = self.create_titles(
+            options['titles'], category_ids, genre_ids
+        )
+        review_ids = self.create_reviews(
+            options['reviews'], title_ids, user_ids, options['zipf']
+        )
+        if review_ids:
+            self.create_comments(
+                options['comments'], review_ids, user_ids,
+                options['comment_skew']
+            )
+        Title.objects.all().rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с'
+        ))
+
+    def insert(self, model, objects):
+        started = time.monotonic()
+        created = 0
+        with transaction.atomic(), keep_auto_now_add(model):
+            for batch in batches(objects, self.batch_size):
+                model.objects.bulk_create(batch)
+                created += len(batch)
+            reset_sequences(model)
+        elapsed = time.monotonic() - started
+        rate = created / elapsed if elapsed else 0
+        self.stdout.write(
+            f'{model._meta.db_table}: {created} строк, '
+            f'{elapsed:.2f} с, {rate:.0f} строк/с'
+        )
+        return created
+
+    @staticmethod
+    def first_free_id(model):
+        return (model.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+
+    def random_pub_date(self):
+        return self.now - PUB_DATE_SPAN * self.rng.random()
+
+    def random_text(self, low, high):
+        return ' '.join(self.rng.choices(WORDS, k=self.rng.randint(low, high)))
+
+    def create_users(self, count):
+        first = self.first_free_id(User)
+        password = make_password(None)
+
+        def users():
+            for pk in range(first, first + count):
+                chance = self.rng.random()
+                if chance < 0.001:
+                    role = User.ADMIN
+                elif chance < 0.01:
+                    role = User.MODERATOR
+                else:
+                    role = User.USER
+                yield User(
+                    id=pk, username=f'user{pk}',
+                    email=f'user{pk}@yamdb.fake', password=password,
+                    role=role,
+                )
+        self.insert(User, users())
+        return range(first, first + count)
+
+    def create_named(self, model, count):
+        first = self.first_free_id(model)
+        prefix = model._meta.model_name
+        self.insert(model, (
+            model(id=pk, name=f'{model._meta.verbose_name} {pk}',
+                  slug=f'{prefix}-{pk}')
+            for pk in range(first, first + count)
+        ))
+        return range(first, first + count)
+
+    def create_titles(self, count, category_ids, genre_ids):
+        first = self.first_free_id(Title)
+        title_ids = range(first, first + count)
+        self.insert(Title, (
+            Title(
+                id=pk, name=f'Произведение {pk}',
+                year=self.rng.randint(1900, self.now.year),
+                description=self.random_text(5, 30),
+                category_id=self.rng.choice(category_ids),
+            )
+            for pk in title_ids
+        ))
+
+        # Популярность жанров по Ципфу, у произведения 1-3+ жанров
+        genre_weights = list(accumulate(zipf_weights(len(genre_ids), 1.0)))
+        through = Title.genre.through
+
+        def title_genres():
+            pk = self.first_free_id(through)
+            for title_id in title_ids:
+                size = 1
+                while size < len(genre_ids) and self.rng.random() < 0.35:
+                    size += 1
+                chosen = set()
+                while len(chosen) < size:
+                    chosen.update(self.rng.choices(
+                        genre_ids, cum_weights=genre_weights
+                    ))
+                for genre_id in sorted(chosen):
+                    yield through(id=pk, title_id=title_id, genre_id=genre_id)
+                    pk += 1
+        self.insert(through, title_genres())
+        return title_ids
+
+    def create_reviews(self, count, title_ids, user_ids, exponent):
+        # Популярность произведений по Ципфу в случайном порядке id;
+        # один отзыв на пару (автор, произведение), поэтому не больше
+        # чем пользователей на произведение
+        weights = zipf_weights(len(title_ids), exponent)
+        self.rng.shuffle(weights)
+        total_weight = sum(weights)
+        first = self.first_free_id(Review)
+        created = []
+
+        def reviews():
+            pk = first
+            for title_id, weight in zip(title_ids, weights):
+                expected = count * weight / total_weight
+                size = int(expected)
+                if self.rng.random() < expected - size:
+                    size += 1
+                size = min(size, len(user_ids))
+                quality = self.rng.gauss(7, 1.5)
+                for author_id in self.rng.sample(user_ids, size):
+                    score = round(self.rng.gauss(quality, 1.5))
+                    yield Review(
+                        id=pk, title_id=title_id, author_id=author_id,
+                        score=min(max(score, 1), 10),
+                        text=self.random_text(5, 40),
+                        pub_date=self.random_pub_date(),
+                    )
+                    pk += 1
+            created.append(pk)
+        self.insert(Review, reviews())
+        return range(first, created[0])
+
+    def create_comments(self, count, review_ids, user_ids, skew):
+        first = self.first_free_id(Comment)
+        size = len(review_ids)
+        self.insert(Comment, (
+            Comment(
+                id=pk,
+                review_id=review_ids[int(size * self.rng.random() ** skew)],
+                author_id=self.rng.choice(user_ids),
+                text=self.random_text(3, 20),
+                pub_date=self.random_pub_date(),
+            )
+            for pk in range(first, first + count)
+        ))
@@ -0,0 +1,146 @@
+import csv
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+
+from reviews.management.bulk import (batches, keep_auto_now_add,
+                                     reset_sequences, truncate_tables)
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+# Файлы в порядке зависимостей: колонка CSV -> (поле модели, модель FK)
+IMPORT_PLAN = (
+    ('users.csv', User, {}),
+    ('category.csv', Category, {}),
+    ('genre.csv', Genre, {}),
+    ('titles.csv', Title, {'category': ('category', Category)}),
+    ('genre_title.csv', Title.genre.through, {
+        'title_id': ('title', Title),
+        'genre_id': ('genre', Genre),
+    }),
+    ('review.csv', Review, {
+        'title_id': ('title', Title),
+        'author': ('author', User),
+    }),
+    ('comments.csv', Comment, {
+        'review_id': ('review', Review),
+        'author': ('author', User),
+    }),
+)
+
+
+class Command(BaseCommand):
+    help = 'Загружает данные из CSV файлов static/data в базу'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с CSV файлами',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одном bulk_create',
+        )
+        parser.add_argument(
+            '--truncate',
+            action='store_true',
+            help='Очистить таблицы перед загрузкой',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        self.batch_size = options['batch_size']
+        if options['truncate']:
+            self.truncate()
+        # id загруженных и уже существующих объектов по моделям
+        self.known_ids = {}
+        self.password = make_password(None)
+        started = time.monotonic()
+        total = 0
+        for filename, model, relations in IMPORT_PLAN:
+            path = os.path.join(options['path'], filename)
+            if not os.path.exists(path):
+                self.stdout.write(f'{filename}: файл не найден, пропущен')
+                continue
+            total += self.import_file(path, model, relations)
+        Title.objects.all().rebuild_ratings()
+        self.report('Итого', total, 0, time.monotonic() - started)
+
+    def truncate(self):
+        models = [model for _, model, _ in reversed(IMPORT_PLAN)]
+        tables = truncate_tables(models)
+        self.stdout.write(f'Очищены таблицы: {", ".join(tables)}')
+
+    def import_file(self, path, model, relations):
+        started = time.monotonic()
+        existing = set(model.objects.values_list('pk', flat=True))
+        loaded = 0
+        with open(path, encoding='utf-8', newline='') as csv_file:
+            rows = csv.DictReader(csv_file)
+            objects = self.build_objects(
+                rows, model, relations, existing
+            )
+            try:
+                with transaction.atomic(), keep_auto_now_add(model):
+                    for batch in batches(objects, self.batch_size):
+                        model.objects.bulk_create(batch)
+                        loaded += len(batch)
+                    reset_sequences(model)
+            except DatabaseError as error:
+                raise CommandError(f'{os.path.basename(path)}: {error}')
+        self.known_ids[model] = existing
+        self.report(
+            os.path.basename(path), loaded, self.skipped,
+            time.monotonic() - started
+        )
+        return loaded
+
+    def build_objects(self, rows, model, relations, existing):
+        """Строит объекты, отбрасывая повторы и строки с неизвестными FK"""
+        self.skipped = 0
+        fields = {}
+        for column in rows.fieldnames:
+            name = relations[column][0] if column in relations else column
+            fields[column] = model._meta.get_field(name)
+        for row in rows:
+            values = self.row_values(row, fields, relations)
+            pk = int(row['id'])
+            if values is None or pk in existing:
+                self.skipped += 1
+                continue
+            existing.add(pk)
+            if model is User:
+                values['password'] = self.password
+            yield model(**values)
+
+    def row_values(self, row, fields, relations):
+        values = {}
+        for column, field in fields.items():
+            raw = row[column]
+            if column in relations:
+                value = int(raw) if raw else None
+                known = self.known_ids.get(relations[column][1], ())
+                if value is not None and value not in known:
+                    return None
+                values[field.attname] = value
+            elif raw == '' and field.null:
+                values[field.attname] = None
+            else:
+                values[field.attname] = field.to_python(raw)
+        return values
+
+    def report(self, name, loaded, skipped, elapsed):
+        rate = loaded / elapsed if elapsed else 0
+        message = (
+            f'{name}: загружено {loaded}, пропущено {skipped}, '
+            f'{elapsed:.2f} с, {rate:.0f} строк/с'
+        )
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохраненные рейтинги произведений по отзывам'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Title.objects.all().rebuild_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитаны рейтинги: {updated}')
+        )
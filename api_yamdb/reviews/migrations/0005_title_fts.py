@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from reviews import fts
+
+
+def create_title_fts(apps, schema_editor):
+    fts.install(schema_editor.connection)
+
+
+def drop_title_fts(apps, schema_editor):
+    fts.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_title_fts, drop_title_fts),
+    ]
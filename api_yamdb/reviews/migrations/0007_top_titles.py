@@ -0,0 +1,29 @@
+# Generated by Django 2.2.16 on 2022-08-22 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopTitle',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('all', 'Все произведения'), ('category', 'Категория'), ('genre', 'Жанр')], max_length=8)),
+                ('scope_id', models.PositiveIntegerField(default=0)),
+                ('position', models.PositiveSmallIntegerField()),
+                ('weighted_rating', models.FloatField(verbose_name='Взвешенный рейтинг')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.Title')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='toptitle',
+            constraint=models.UniqueConstraint(fields=('scope', 'scope_id', 'position'), name='top_title_position'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2022-08-22 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_top_titles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleTrend',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trend', serialize=False, to='reviews.Title')),
+                ('heat', models.FloatField(db_index=True)),
+            ],
+        ),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import Case, F, FloatField, OuterRef, Subquery, When
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
 
 from users.models import User
 
@@ -6,6 +9,9 @@ from users.models import User
 class Category(models.Model):
     name = models.CharField(max_length=256)
     slug = models.SlugField(max_length=50, unique=True)
+    updated_at = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True
+    )
 
     def __str__(self):
         return self.name
@@ -14,11 +20,77 @@ class Category(models.Model):
 class Genre(models.Model):
     name = models.CharField(max_length=256)
     slug = models.SlugField(unique=True)
+    updated_at = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True
+    )
 
     def __str__(self):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+    def apply_review_delta(self, title_id, score_delta, count_delta):
+        """Сдвиг сохраненных агрегатов отзывов произведения"""
+        titles = self.filter(id=title_id)
+        titles.update(
+            score_sum=F('score_sum') + score_delta,
+            review_count=F('review_count') + count_delta,
+            updated_at=timezone.now(),
+        )
+        titles.update(rating=self._rating_expression())
+
+    def subtract_reviews(self, reviews):
+        """Вычитание отзывов из сохраненных агрегатов их произведений:
+        два запроса на все произведения, без загрузки отзывов"""
+        grouped = reviews.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        titles = self.filter(
+            id__in=reviews.order_by().values('title_id')
+        )
+        titles.update(
+            score_sum=F('score_sum') - Subquery(grouped.annotate(
+                total=models.Sum('score')
+            ).values('total')),
+            review_count=F('review_count') - Subquery(grouped.annotate(
+                total=models.Count('id')
+            ).values('total')),
+            updated_at=timezone.now(),
+        )
+        titles.update(rating=self._rating_expression())
+
+    def rebuild_ratings(self):
+        """Полный пересчет агрегатов отзывов по таблице Review"""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        self.update(
+            score_sum=Coalesce(
+                Subquery(reviews.annotate(
+                    total=models.Sum('score')
+                ).values('total')),
+                0
+            ),
+            review_count=Coalesce(
+                Subquery(reviews.annotate(
+                    total=models.Count('id')
+                ).values('total')),
+                0
+            ),
+        )
+        return self.update(
+            rating=self._rating_expression(), updated_at=timezone.now()
+        )
+
+    @staticmethod
+    def _rating_expression():
+        return Case(
+            When(review_count=0, then=None),
+            default=Cast(F('score_sum'), FloatField()) / F('review_count'),
+            output_field=FloatField(),
+        )
+
+
 class Title(models.Model):
     name = models.CharField(max_length=256)
     year = models.IntegerField(null=True, blank=True)
@@ -30,6 +102,27 @@ class Title(models.Model):
         blank=True,
         null=True
     )
+    score_sum = models.PositiveIntegerField(default=0, editable=False)
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    rating = models.FloatField(null=True, blank=True, editable=False)
+    updated_at = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True
+    )
+
+    objects = TitleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['category', 'year'], name='title_category_year_idx'
+            ),
+            models.Index(fields=['year'], name='title_year_idx'),
+            models.Index(fields=['rating', 'id'], name='title_rating_idx'),
+            models.Index(
+                fields=['review_count', 'id'], name='title_review_count_idx'
+            ),
+            models.Index(fields=['name', 'id'], name='title_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -39,6 +132,9 @@ class Review(models.Model):
     text = models.TextField()
     score = models.IntegerField()
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    updated_at = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True
+    )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='reviews')
     title = models.ForeignKey(
@@ -52,11 +148,122 @@ class Review(models.Model):
                 name='one_review_per_title'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
 
 
 class Comment(models.Model):
     text = models.TextField()
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    updated_at = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True
+    )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='comments')
     review = models.ForeignKey(Review, on_delete=models.CASCADE)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
+
+
+class TopTitle(models.Model):
+    """Место произведения в предрассчитанном списке лучших.
+
+    Список задается парой (scope, scope_id): общий, по категории или
+    по жанру; заполняется командой rebuild_top_titles.
+    """
+
+    ALL = 'all'
+    CATEGORY = 'category'
+    GENRE = 'genre'
+    SCOPES = (
+        (ALL, 'Все произведения'),
+        (CATEGORY, 'Категория'),
+        (GENRE, 'Жанр'),
+    )
+
+    scope = models.CharField(max_length=8, choices=SCOPES)
+    scope_id = models.PositiveIntegerField(default=0)
+    position = models.PositiveSmallIntegerField()
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='+'
+    )
+    weighted_rating = models.FloatField('Взвешенный рейтинг')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'scope_id', 'position'],
+                name='top_title_position'
+            )
+        ]
+
+
+class SimilarTitle(models.Model):
+    """Сосед произведения в списке похожих.
+
+    Заполняется командой rebuild_similar_titles.
+    """
+
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='+'
+    )
+    position = models.PositiveSmallIntegerField()
+    similar = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='+'
+    )
+    similarity = models.FloatField('Сходство')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'position'], name='similar_title_position'
+            )
+        ]
+
+
+class Recommendation(models.Model):
+    """Рекомендованное пользователю произведение.
+
+    Заполняется командой rebuild_recommendations.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='+'
+    )
+    position = models.PositiveSmallIntegerField()
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='+'
+    )
+    predicted_score = models.FloatField('Предсказанная оценка')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'position'], name='recommendation_position'
+            )
+        ]
+
+
+class TitleTrend(models.Model):
+    """Затухающая активность по отзывам и комментариям произведения.
+
+    heat = ln(сумма weight * e^(λ * t) по событиям), поэтому порядок
+    произведений не меняется со временем, а текущая активность равна
+    e^(heat - λ * now); считается в api/trending.py.
+    """
+
+    title = models.OneToOneField(
+        Title, on_delete=models.CASCADE, primary_key=True,
+        related_name='trend'
+    )
+    heat = models.FloatField(db_index=True)
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -51,3 +52,44 @@ class User(AbstractUser):
                 name='username_is_not_me'
             )
         ]
+        indexes = [
+            models.Index(fields=['role', 'id'], name='user_role_id_idx'),
+        ]
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди отправки (см. api/outbox.py)"""
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField(max_length=255, blank=True)
+    to = models.EmailField('Получатель')
+    status = models.CharField(
+        max_length=8, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.UUIDField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outgoing_email_due_idx'
+            ),
+            models.Index(
+                fields=['claimed_by'], name='outgoing_email_claim_idx'
+            ),
+        ]
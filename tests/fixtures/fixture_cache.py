@@ -0,0 +1,24 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from django.core.cache import caches
+
+    from api.suggest import index
+    from api.trending import heap
+    from api.user_cache import users
+
+    for cache in caches.all():
+        cache.clear()
+    index.reset()
+    heap.reset()
+    users.reset()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def eager_email_outbox(settings):
+    # письма из очереди уходят сразу после коммита, как ждут тесты
+    # регистрации; тесты очереди выключают этот режим
+    settings.EMAIL_OUTBOX_EAGER = True
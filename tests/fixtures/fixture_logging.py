@@ -0,0 +1,17 @@
+import logging
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def slow_request_log(tmp_path, monkeypatch):
+    # лог медленных запросов пишется во временный каталог теста,
+    # а не в SLOW_REQUEST_LOG в каталоге проекта
+    handler = logging.FileHandler(
+        tmp_path / 'slow_requests.log', encoding='utf-8', delay=True
+    )
+    monkeypatch.setattr(
+        logging.getLogger('api.slow_requests'), 'handlers', [handler]
+    )
+    yield handler
+    handler.close()
@@ -0,0 +1,135 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_reviews
+
+
+class Test08TitleRating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_stored_on_review_changes(self, admin_client, admin):
+        from reviews.models import Title
+
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.score_sum, title.review_count) == (12, 3), (
+            'Проверьте, что при создании отзыва обновляются '
+            '`score_sum` и `review_count` произведения'
+        )
+        assert title.rating == 4, (
+            'Проверьте, что при создании отзыва обновляется `rating` произведения'
+        )
+
+        client_user = auth_client(user)
+        client_user.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/',
+            data={'text': 'qwerty123', 'score': 9}
+        )
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count, title.rating) == (18, 3, 6), (
+            'Проверьте, что при изменении оценки отзыва пересчитывается рейтинг произведения'
+        )
+
+        admin_client.delete(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        )
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count, title.rating) == (13, 2, 6.5), (
+            'Проверьте, что при удалении отзыва пересчитывается рейтинг произведения'
+        )
+
+        for review in reviews[1:]:
+            admin_client.delete(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+            )
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json().get('rating') is None, (
+            'Проверьте, что после удаления всех отзывов `rating` равен `None`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_ratings_command(self, admin_client, admin):
+        from reviews.models import Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        Title.objects.update(score_sum=0, review_count=0, rating=None)
+        call_command('rebuild_ratings')
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (12, 3, 4), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает рейтинги по отзывам'
+        )
+        assert Title.objects.get(id=titles[1]['id']).rating is None, (
+            'Проверьте, что команда `rebuild_ratings` оставляет `rating` пустым '
+            'для произведений без отзывов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rating_after_author_deleted(self, admin_client, admin,
+                                            user, moderator):
+        from reviews.models import Category, Title
+
+        category = Category.objects.create(name='Фильм', slug='film')
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        auth_client(user).post(url, data={'text': 'Отлично', 'score': 10})
+        auth_client(moderator).post(url, data={'text': 'Плохо', 'score': 2})
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count, title.rating) == (2, 1, 2), (
+            'Проверьте, что каскадное удаление отзывов вместе с автором '
+            'пересчитывает рейтинг произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_cascade_delete_queries(self, admin_client, admin, user,
+                                       moderator):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Category, Title
+
+        category = Category.objects.create(name='Фильм', slug='film')
+        titles = [
+            Title.objects.create(name=f'Фильм {i}', year=2000,
+                                 category=category)
+            for i in range(5)
+        ]
+        for title in titles:
+            url = f'/api/v1/titles/{title.id}/reviews/'
+            auth_client(user).post(url, data={'text': 'Отлично', 'score': 10})
+            auth_client(moderator).post(url, data={'text': 'Плохо', 'score': 2})
+
+        def title_updates(queries):
+            return [
+                query['sql'] for query in queries
+                if query['sql'].startswith('UPDATE "reviews_title"')
+            ]
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        assert len(title_updates(context.captured_queries)) == 2, (
+            'Проверьте, что удаление автора сдвигает агрегаты всех его '
+            'произведений одним сгруппированным запросом, а не по отзыву'
+        )
+        for title in titles:
+            title.refresh_from_db()
+            assert (title.score_sum, title.review_count, title.rating) == (2, 1, 2), (
+                'Проверьте, что удаление автора пересчитывает рейтинг '
+                'его произведений'
+            )
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(f'/api/v1/titles/{titles[0].id}/')
+        assert response.status_code == 204
+        assert not title_updates(context.captured_queries), (
+            'Проверьте, что удаление произведения не пересчитывает '
+            'агрегаты по каждому удаляемому отзыву'
+        )
+
+        admin_client.delete(f'/api/v1/users/{moderator.username}/')
+        assert Title.objects.filter(review_count=0, rating=None).count() == 4, (
+            'Проверьте, что после удаления всех авторов `rating` равен `None`'
+        )
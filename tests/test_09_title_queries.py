@@ -0,0 +1,40 @@
+import pytest
+
+
+class Test09TitleQueries:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_list_constant_queries(self, client,
+                                            django_assert_num_queries):
+        from reviews.models import Category, Genre, Title
+
+        categories = [
+            Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+            for i in range(5)
+        ]
+        genres = [
+            Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+            for i in range(5)
+        ]
+        for i in range(100):
+            title = Title.objects.create(
+                name=f'Произведение {i}', year=2000,
+                category=categories[i % len(categories)]
+            )
+            title.genre.set(genres[:i % len(genres) + 1])
+
+        # валидаторы ETag (кеш ответов локален для процесса) + count
+        # + страница произведений + жанры одним prefetch-запросом
+        with django_assert_num_queries(4):
+            response = client.get('/api/v1/titles/?limit=100')
+        data = response.json()
+        assert len(data['results']) == 100, (
+            'Проверьте, что GET запрос `/api/v1/titles/?limit=100` '
+            'возвращает все 100 произведений'
+        )
+        assert all(
+            title['category'] and title['genre'] for title in data['results']
+        ), (
+            'Проверьте, что при GET запросе `/api/v1/titles/` '
+            'возвращаются жанры и категория каждого произведения'
+        )
@@ -0,0 +1,55 @@
+import pytest
+
+from .common import create_comments
+
+
+class Test10KeysetPagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_cursor(self, client, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        response = client.get(f'{url}?limit=2')
+        assert 'count' in response.json(), (
+            'Проверьте, что без параметра `cursor` по адресу `/api/v1/titles/{title_id}/reviews/` '
+            'сохраняется пагинация limit/offset'
+        )
+
+        response = client.get(f'{url}?cursor=&limit=2')
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data and len(data['results']) == 2, (
+            'Проверьте, что с параметром `cursor` отзывы отдаются '
+            'keyset-страницами без `count`'
+        )
+        assert data['next'], (
+            'Проверьте, что keyset-страница содержит ссылку `next`'
+        )
+        seen = [review['id'] for review in data['results']]
+        data = client.get(data['next']).json()
+        seen += [review['id'] for review in data['results']]
+        assert data['next'] is None, (
+            'Проверьте, что последняя keyset-страница не содержит ссылку `next`'
+        )
+        assert seen == sorted(
+            (review['id'] for review in reviews), reverse=True
+        ), (
+            'Проверьте, что keyset-пагинация отдает все отзывы '
+            'от новых к старым без повторов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_comments_cursor(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        response = client.get(f'{url}?cursor=&limit=10')
+        data = response.json()
+        assert len(data['results']) == len(comments) and data['next'] is None, (
+            'Проверьте, что keyset-пагинация работает для комментариев'
+        )
+        response = client.get(f'{url}?cursor=broken')
+        assert response.status_code == 404, (
+            'Проверьте, что при неверном курсоре возвращается статус 404'
+        )
@@ -0,0 +1,65 @@
+import pytest
+from django.core.management import call_command
+
+
+class Test11ImportCsv:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_import_static_data(self):
+        from reviews.models import Comment, Review, Title
+        from users.models import User
+
+        call_command('import_csv', batch_size=10)
+        assert User.objects.count() == 5 and Title.objects.count() == 32, (
+            'Проверьте, что команда `import_csv` загружает пользователей '
+            'и произведения из `static/data`'
+        )
+        assert Review.objects.count() == 72 and Comment.objects.count() == 3, (
+            'Проверьте, что команда `import_csv` загружает отзывы и комментарии'
+        )
+        review = Review.objects.get(id=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что команда `import_csv` сохраняет даты публикации из CSV'
+        )
+        title = Title.objects.get(id=1)
+        assert title.review_count == title.reviews.count(), (
+            'Проверьте, что после импорта пересчитываются рейтинги произведений'
+        )
+
+        call_command('import_csv')
+        assert Review.objects.count() == 72, (
+            'Проверьте, что повторный запуск `import_csv` не дублирует строки'
+        )
+        call_command('import_csv', truncate=True)
+        assert Review.objects.count() == 72, (
+            'Проверьте, что `import_csv --truncate` перезагружает данные'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_generate_dataset(self):
+        from reviews.models import Comment, Review, Title
+
+        options = dict(users=50, categories=3, genres=5, titles=40,
+                       reviews=500, comments=300, seed=7)
+        call_command('generate_dataset', **options)
+        reviews = list(Review.objects.order_by('id').values_list(
+            'title_id', 'author_id', 'score'
+        ))
+        assert 0 < len(reviews) <= 500 and Comment.objects.count() == 300, (
+            'Проверьте, что команда `generate_dataset` создает '
+            'заданное количество отзывов и комментариев'
+        )
+        assert len(set((title, author) for title, author, _ in reviews)) == len(reviews), (
+            'Проверьте, что `generate_dataset` создает не больше одного '
+            'отзыва автора на произведение'
+        )
+        assert sum(Title.objects.values_list('review_count', flat=True)) == len(reviews), (
+            'Проверьте, что после генерации пересчитываются рейтинги произведений'
+        )
+
+        call_command('generate_dataset', truncate=True, **options)
+        assert reviews == list(Review.objects.order_by('id').values_list(
+            'title_id', 'author_id', 'score'
+        )), (
+            'Проверьте, что `generate_dataset` детерминирован при одном `seed`'
+        )
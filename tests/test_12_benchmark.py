@@ -0,0 +1,49 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+class Test12Benchmark:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_benchmark_report(self, tmp_path, settings):
+        settings.REST_FRAMEWORK = dict(
+            settings.REST_FRAMEWORK,
+            DEFAULT_THROTTLE_RATES={'signup': '1/hour', 'token': '1/hour'},
+        )
+        call_command('generate_dataset', users=20, categories=2, genres=3,
+                     titles=10, reviews=60, comments=30, seed=1)
+        report_path = tmp_path / 'report.json'
+        call_command('benchmark_api', iterations=2, warmup=0,
+                     output=str(report_path))
+        report = json.loads(report_path.read_text(encoding='utf-8'))
+        for name in ('titles-list', 'titles-list?genre', 'review-list',
+                     'comment-list', 'users-list', 'signup', 'token'):
+            assert name in report, (
+                f'Проверьте, что отчет `benchmark_api` содержит маршрут `{name}`'
+            )
+        assert report['signup']['status'] == 200, (
+            'Проверьте, что `benchmark_api` замеряет регистрацию '
+            'без ограничения частоты'
+        )
+        titles = report['titles-list']
+        assert titles['status'] == 200 and titles['queries'] > 0, (
+            'Проверьте, что `benchmark_api` считает запросы к БД для маршрута'
+        )
+        assert titles['queries'] > titles['warm']['queries'], (
+            'Проверьте, что `benchmark_api` замеряет список без кеша ответов '
+            'и отдельно с кешем'
+        )
+        assert titles['p50_ms'] <= titles['p95_ms'] <= titles['p99_ms'], (
+            'Проверьте, что `benchmark_api` считает перцентили задержки'
+        )
+
+        for result in report.values():
+            result['queries'] = 0
+        report_path.write_text(json.dumps(report), encoding='utf-8')
+        with pytest.raises(CommandError):
+            call_command('benchmark_api', iterations=1, warmup=0,
+                         output=str(tmp_path / 'current.json'),
+                         baseline=str(report_path))
@@ -0,0 +1,53 @@
+import json
+import logging
+
+import pytest
+
+from .common import create_comments
+
+
+class Test13QueryInstrumentation:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_server_timing(self, client, admin_client, admin, settings):
+        settings.SLOW_REQUEST_THRESHOLD_MS = 10 ** 6
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        timing = response['Server-Timing']
+        assert 'db;dur=' in timing and 'total;dur=' in timing, (
+            'Проверьте, что ответ содержит заголовок `Server-Timing` '
+            'с общим временем и временем запросов к БД'
+        )
+        assert 'db-slowest;dur=' in timing, (
+            'Проверьте, что `Server-Timing` содержит самый медленный запрос'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_slow_log(self, client, admin_client, admin, settings, caplog,
+                        slow_request_log):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        settings.SLOW_REQUEST_THRESHOLD_MS = 0
+        logger = logging.getLogger('api.slow_requests')
+        logger.propagate = True
+        try:
+            with caplog.at_level(logging.WARNING, logger='api.slow_requests'):
+                client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        finally:
+            logger.propagate = False
+        entry = json.loads(caplog.records[-1].getMessage())
+        slow_request_log.flush()
+        with open(slow_request_log.baseFilename, encoding='utf-8') as log:
+            assert json.loads(log.readlines()[-1]) == entry, (
+                'Проверьте, что медленные запросы пишутся в файл лога'
+            )
+        assert entry['view'] == 'ReviewViewSet.list', (
+            'Проверьте, что в логе медленных запросов указано имя вида'
+        )
+        assert entry['queries'] > 0 and '%s' in entry['slowest_sql'], (
+            'Проверьте, что в логе медленных запросов есть число запросов '
+            'и нормализованный SQL'
+        )
+        assert isinstance(entry['duplicates'], dict), (
+            'Проверьте, что в логе медленных запросов отмечаются '
+            'повторяющиеся запросы'
+        )
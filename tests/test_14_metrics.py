@@ -0,0 +1,33 @@
+import pytest
+
+
+class Test14Metrics:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_metrics_endpoint(self, client):
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/100500/')
+        response = client.get('/api/metrics')
+        assert response.status_code == 200, (
+            'Проверьте, что страница `/api/metrics` доступна'
+        )
+        content = response.content.decode()
+        assert (
+            'yamdb_http_requests_total{method="GET",route="titles-list",'
+            'status="200"}' in content
+        ), (
+            'Проверьте, что `/api/metrics` считает запросы по именам '
+            'маршрутов роутера'
+        )
+        assert 'route="titles-detail",status="404"' in content, (
+            'Проверьте, что `/api/metrics` считает коды ответов'
+        )
+        assert '100500' not in content, (
+            'Проверьте, что в метках маршрутов нет идентификаторов из пути'
+        )
+        for name in ('yamdb_http_request_duration_seconds_bucket',
+                     'yamdb_http_request_db_queries_bucket',
+                     'yamdb_http_requests_in_progress'):
+            assert name in content, (
+                f'Проверьте, что `/api/metrics` содержит метрику `{name}`'
+            )
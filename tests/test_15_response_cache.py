@@ -0,0 +1,102 @@
+import pytest
+
+from .common import auth_client, create_comments, create_reviews
+
+CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+)
+
+
+class Test15ResponseCache:
+
+    @pytest.mark.parametrize('backend', CACHE_BACKENDS)
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cache_and_invalidation(self, backend, client, admin_client,
+                                       admin, settings, tmp_path):
+        settings.CACHES = {
+            'default': {'BACKEND': backend, 'LOCATION': str(tmp_path)},
+        }
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+
+        for url in ('/api/v1/titles/', title_url, reviews_url,
+                    '/api/v1/genres/', '/api/v1/categories/'):
+            assert client.get(url)['X-Cache'] == 'MISS'
+            response = client.get(url)
+            assert response['X-Cache'] == 'HIT', (
+                f'Проверьте, что повторный GET запрос `{url}` отдается из кеша'
+            )
+        assert client.get(f'{reviews_url}?limit=1')['X-Cache'] == 'MISS', (
+            'Проверьте, что параметры пагинации входят в ключ кеша'
+        )
+
+        auth_client(user).patch(
+            f'{reviews_url}{reviews[1]["id"]}/',
+            data={'text': 'qwerty123', 'score': 9}
+        )
+        response = client.get(title_url)
+        assert response['X-Cache'] == 'MISS' and response.json()['rating'] == 6, (
+            'Проверьте, что изменение отзыва сбрасывает кеш карточки произведения'
+        )
+        response = client.get(reviews_url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что изменение отзыва сбрасывает кеш списка отзывов'
+        )
+        assert client.get('/api/v1/titles/')['X-Cache'] == 'MISS', (
+            'Проверьте, что изменение отзыва сбрасывает кеш списка произведений'
+        )
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'HIT', (
+            'Проверьте, что изменение отзыва не сбрасывает кеш жанров'
+        )
+
+        admin_client.post('/api/v1/genres/', data={'name': 'Мюзикл', 'slug': 'musical'})
+        response = client.get('/api/v1/genres/')
+        assert response['X-Cache'] == 'MISS' and response.json()['count'] == 4, (
+            'Проверьте, что создание жанра сбрасывает кеш списка жанров'
+        )
+
+        admin_client.delete(title_url)
+        assert client.get(title_url).status_code == 404, (
+            'Проверьте, что удаление произведения сбрасывает кеш его карточки'
+        )
+
+    @pytest.mark.parametrize('backend', CACHE_BACKENDS)
+    @pytest.mark.django_db(transaction=True)
+    def test_02_author_rename(self, backend, client, admin_client, admin,
+                              settings, tmp_path):
+        settings.CACHES = {
+            'default': {'BACKEND': backend, 'LOCATION': str(tmp_path)},
+        }
+        comments, reviews, titles, user, _ = create_comments(
+            admin_client, admin
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        urls = (
+            reviews_url, f'{reviews_url}{reviews[1]["id"]}/',
+            comments_url, f'{comments_url}{comments[1]["id"]}/',
+        )
+        etags = {}
+        for url in urls:
+            client.get(url)
+            etags[url] = client.get(url)['ETag']
+
+        response = auth_client(user).patch(
+            '/api/v1/users/me/', data={'username': 'renamed'}
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что PATCH запрос `/api/v1/users/me/` меняет имя'
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response['X-Cache'] == 'MISS' and 'renamed' in str(
+                response.json()
+            ), (
+                f'Проверьте, что смена имени автора сбрасывает кеш `{url}`'
+            )
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == 200, (
+                f'Проверьте, что смена имени автора меняет ETag `{url}`'
+            )
@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from .common import auth_client, create_reviews
+
+
+class Test16ConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_etag(self, client, admin_client, admin,
+                     django_assert_num_queries):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+
+        # кеш ответов в тестах локален для процесса: списки, как
+        # и объекты, проверяются одним запросом к БД
+        urls = (
+            ('/api/v1/titles/', 1), (title_url, 1), (reviews_url, 1),
+            (f'{reviews_url}{reviews[0]["id"]}/', 1), ('/api/v1/genres/', 1),
+        )
+        for url, queries in urls:
+            response = client.get(url)
+            assert response.has_header('ETag') and response.has_header('Last-Modified'), (
+                f'Проверьте, что GET запрос `{url}` возвращает ETag и Last-Modified'
+            )
+            with django_assert_num_queries(queries):
+                response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            assert response.status_code == 304, (
+                f'Проверьте, что GET запрос `{url}` с актуальным If-None-Match '
+                f'возвращает 304 не более чем {queries} запросом к БД'
+            )
+
+        response = client.get(title_url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        response = client.get(reviews_url)
+        list_etag = response['ETag']
+        response = client.get(title_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304, (
+            'Проверьте, что GET запрос с актуальным If-Modified-Since возвращает 304'
+        )
+
+        auth_client(user).patch(
+            f'{reviews_url}{reviews[1]["id"]}/',
+            data={'text': 'qwerty123', 'score': 9}
+        )
+        response = client.get(title_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, (
+            'Проверьте, что изменение отзыва меняет ETag произведения'
+        )
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=list_etag)
+        assert response.status_code == 200 and response['ETag'] != list_etag, (
+            'Проверьте, что изменение отзыва меняет ETag списка отзывов'
+        )
+
+        response = client.get('/api/v1/titles/?limit=1')
+        other = client.get('/api/v1/titles/?limit=2')
+        assert response['ETag'] != other['ETag'], (
+            'Проверьте, что ETag списка зависит от параметров запроса'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_invalid_id(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        for url in ('/api/v1/titles/abc/', f'{reviews_url}abc/',
+                    f'{reviews_url}1/comments/abc/'):
+            assert client.get(url).status_code == 404, (
+                f'Проверьте, что GET запрос `{url}` с нечисловым id '
+                'возвращает 404'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_list_without_signals(self, client, admin_client, admin):
+        from reviews.models import Review
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(reviews_url)['ETag']
+        # запись в обход сигналов, как в командах и в другом воркере
+        Review.objects.filter(title_id=titles[0]['id']).update(
+            text='qwerty123', updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, (
+            'Проверьте, что при локальном для процесса кеше ответов ETag '
+            'списка меняется и без сдвига версий групп кеша'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_list_shared_cache(self, client, admin_client, admin, settings,
+                                  tmp_path, django_assert_num_queries):
+        from django.core.cache import caches
+
+        settings.CACHES = {
+            **settings.CACHES,
+            'shared': {
+                'BACKEND': (
+                    'django.core.cache.backends.filebased.FileBasedCache'
+                ),
+                'LOCATION': str(tmp_path),
+            },
+        }
+        settings.RESPONSE_CACHE_ALIAS = 'shared'
+        try:
+            reviews, titles, user, _ = create_reviews(admin_client, admin)
+            reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            for url in ('/api/v1/titles/', reviews_url, '/api/v1/genres/'):
+                etag = client.get(url)['ETag']
+                with django_assert_num_queries(0):
+                    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+                assert response.status_code == 304, (
+                    f'Проверьте, что при общем кеше ответов GET запрос `{url}` '
+                    'с актуальным If-None-Match возвращает 304 без запросов к БД'
+                )
+
+            etag = client.get(reviews_url)['ETag']
+            auth_client(user).patch(
+                f'{reviews_url}{reviews[1]["id"]}/',
+                data={'text': 'qwerty123', 'score': 9}
+            )
+            response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                'Проверьте, что при общем кеше ответов изменение отзыва '
+                'меняет ETag списка отзывов'
+            )
+        finally:
+            caches['shared'].clear()
@@ -0,0 +1,82 @@
+import re
+
+import pytest
+from django.db import connection
+
+
+def query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def table_scans(plan, table):
+    """Шаги плана, читающие таблицу целиком без индекса"""
+    pattern = re.compile(rf'^SCAN (TABLE )?{table}( AS \w+)?$')
+    return [step for step in plan if pattern.match(step)]
+
+
+class Test17QueryPlans:
+
+    def assert_uses_index(self, queryset, table, description):
+        plan = query_plan(queryset)
+        assert not table_scans(plan, table), (
+            f'Проверьте, что {description} использует индекс таблицы '
+            f'`{table}`, а не полный просмотр. План: {plan}'
+        )
+        assert any(table in step and 'INDEX' in step for step in plan), (
+            f'Проверьте, что {description} использует индекс таблицы '
+            f'`{table}`. План: {plan}'
+        )
+        return plan
+
+    @pytest.mark.django_db
+    def test_01_title_filters(self):
+        from api.filters import TitleFilter
+        from api.views import TitleViewSet
+
+        for params, table, description in (
+            ({'category': 'films'}, 'reviews_title', 'фильтр по категории'),
+            ({'genre': 'drama'}, 'reviews_title_genre', 'фильтр по жанру'),
+            ({'year': 2000}, 'reviews_title', 'фильтр по году'),
+            ({'category': 'films', 'year': 2000}, 'reviews_title',
+             'фильтр по категории и году'),
+        ):
+            queryset = TitleFilter(params, queryset=TitleViewSet.queryset).qs
+            self.assert_uses_index(queryset, table, description)
+
+    @pytest.mark.django_db
+    def test_02_reviews_and_comments(self):
+        from api.views import CommentViewSet, ReviewViewSet
+
+        view = ReviewViewSet(kwargs={'titles_id': 1})
+        plan = self.assert_uses_index(
+            view.get_queryset().order_by('-pub_date', '-id')[:10],
+            'reviews_review', 'список отзывов произведения'
+        )
+        assert not any('TEMP B-TREE' in step for step in plan), (
+            'Проверьте, что сортировка отзывов по дате берется из индекса'
+        )
+
+        view = CommentViewSet(kwargs={'review_id': 1})
+        plan = self.assert_uses_index(
+            view.get_queryset().order_by('-pub_date', '-id')[:10],
+            'reviews_comment', 'список комментариев отзыва'
+        )
+        assert not any('TEMP B-TREE' in step for step in plan), (
+            'Проверьте, что сортировка комментариев по дате берется из индекса'
+        )
+
+    @pytest.mark.django_db
+    def test_03_users(self):
+        from users.models import User
+
+        self.assert_uses_index(
+            User.objects.filter(username='TestUser'), 'users_user',
+            'поиск пользователя по `username`'
+        )
+        self.assert_uses_index(
+            User.objects.filter(role=User.ADMIN), 'users_user',
+            'выборка пользователей по роли'
+        )
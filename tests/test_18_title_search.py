@@ -0,0 +1,58 @@
+import pytest
+
+from .common import create_categories, create_genre
+
+
+def create_title(admin_client, genres, categories, name, description):
+    data = {'name': name, 'year': 2000, 'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'], 'description': description}
+    return admin_client.post('/api/v1/titles/', data=data).json()['id']
+
+
+class Test18TitleSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_full_text_search(self, client, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        hedgehog = create_title(admin_client, genres, categories,
+                                'Ёжик в тумане', 'Мультфильм о дружбе')
+        friends = create_title(admin_client, genres, categories,
+                               'Друзья', 'Сериал про ежика и туман')
+        create_title(admin_client, genres, categories,
+                     'Побег из Шоушенка', 'Тюремная драма')
+
+        response = client.get('/api/v1/titles/?search=ежик туман')
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [hedgehog, friends], (
+            'Проверьте, что `?search=` ищет по префиксам слов в названии и '
+            'описании, без учета «ё» и регистра, и выше ставит совпадения '
+            'в названии'
+        )
+        response = client.get('/api/v1/titles/?search=ШОУ')
+        assert len(response.json()['results']) == 1, (
+            'Проверьте, что `?search=` ищет по началу слова'
+        )
+
+        admin_client.patch(f'/api/v1/titles/{friends}/',
+                           data={'name': 'Друзья', 'description': 'Ситком'})
+        admin_client.delete(f'/api/v1/titles/{hedgehog}/')
+        response = client.get('/api/v1/titles/?search=ежик')
+        assert response.json()['results'] == [], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'и удалении произведений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_search_fallback(self, client, admin_client, monkeypatch):
+        from reviews import fts
+
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        create_title(admin_client, genres, categories, 'Побег из Шоушенка', '')
+        create_title(admin_client, genres, categories, 'Друзья', '')
+        monkeypatch.setattr(fts, 'is_installed', lambda connection: False)
+        response = client.get('/api/v1/titles/?search=Шоушен')
+        assert len(response.json()['results']) == 1, (
+            'Проверьте, что без FTS5 `?search=` ищет по названию через icontains'
+        )
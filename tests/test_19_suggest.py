@@ -0,0 +1,54 @@
+import pytest
+
+from .common import auth_client, create_reviews
+
+
+class Test19Suggest:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_suggest(self, client, admin_client, admin,
+                        django_assert_num_queries):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        response = client.get('/api/v1/suggest/?q=по')
+        assert response.status_code == 200, (
+            'Проверьте, что страница `/api/v1/suggest/` доступна без токена'
+        )
+        names = [item['name'] for item in response.json()['results']]
+        assert names == ['Поворот туда'], (
+            'Проверьте, что `/api/v1/suggest/?q=` ищет по началу названия'
+        )
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/suggest/?q=ту')
+        assert response.json()['results'][0]['name'] == 'Поворот туда', (
+            'Проверьте, что подсказки ищутся по началу любого слова '
+            'без запросов к БД после построения индекса'
+        )
+
+        response = client.get('/api/v1/suggest/?q=Ко')
+        assert response.json()['results'] == [
+            {'type': 'genre', 'slug': 'comedy', 'name': 'Комедия'}
+        ], (
+            'Проверьте, что `/api/v1/suggest/` подсказывает жанры'
+        )
+
+        data = {'name': 'Проект X', 'year': 2021, 'genre': ['drama'],
+                'category': 'books', 'description': ''}
+        new_id = admin_client.post('/api/v1/titles/', data=data).json()['id']
+        auth_client(user).post(f'/api/v1/titles/{new_id}/reviews/',
+                               data={'text': 'a', 'score': 5})
+        admin_client.post(f'/api/v1/titles/{new_id}/reviews/',
+                          data={'text': 'b', 'score': 5})
+        response = client.get('/api/v1/suggest/?q=проект')
+        ids = [item['id'] for item in response.json()['results']]
+        assert ids == [new_id, titles[1]['id']], (
+            'Проверьте, что индекс подсказок обновляется при создании '
+            'произведений и упорядочен по числу отзывов'
+        )
+
+        admin_client.delete(f'/api/v1/titles/{new_id}/')
+        response = client.get('/api/v1/suggest/?q=проект&limit=1')
+        ids = [item['id'] for item in response.json()['results']]
+        assert ids == [titles[1]['id']], (
+            'Проверьте, что удаленные произведения пропадают из подсказок '
+            'и работает параметр `limit`'
+        )
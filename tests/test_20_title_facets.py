@@ -0,0 +1,53 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test20TitleFacets:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_facets(self, client, admin_client, django_assert_max_num_queries):
+        titles, categories, genres = create_titles(admin_client)
+        data = {'name': 'Поворот', 'year': 2020, 'genre': [genres[1]['slug'], genres[2]['slug']],
+                'category': categories[1]['slug'], 'description': 'Крутое пике'}
+        admin_client.post('/api/v1/titles/', data=data)
+
+        response = client.get('/api/v1/titles/')
+        assert 'facets' not in response.json(), (
+            'Проверьте, что фасеты возвращаются только по параметру `facets`'
+        )
+
+        # 4 запроса списка + по одному на фасет
+        with django_assert_max_num_queries(7):
+            response = client.get('/api/v1/titles/?facets=genre,category,year')
+        facets = response.json()['facets']
+        assert facets['genre'] == [
+            {'count': 2, 'slug': 'drama', 'name': 'Драма'},
+            {'count': 2, 'slug': 'comedy', 'name': 'Комедия'},
+            {'count': 1, 'slug': 'horror', 'name': 'Ужасы'},
+        ], (
+            'Проверьте, что фасет `genre` считает произведения по жанрам'
+        )
+        assert facets['category'] == [
+            {'count': 2, 'slug': 'books', 'name': 'Книги'},
+            {'count': 1, 'slug': 'films', 'name': 'Фильм'},
+        ], (
+            'Проверьте, что фасет `category` считает произведения по категориям'
+        )
+        assert facets['year'] == [{'count': 2, 'year': 2020}, {'count': 1, 'year': 2000}], (
+            'Проверьте, что фасет `year` считает произведения по годам'
+        )
+
+        response = client.get('/api/v1/titles/?genre=drama&facets=genre')
+        assert response.json()['facets']['genre'] == [
+            {'count': 2, 'slug': 'drama', 'name': 'Драма'},
+            {'count': 1, 'slug': 'comedy', 'name': 'Комедия'},
+        ], (
+            'Проверьте, что фасеты считаются для текущего набора фильтров '
+            'и учитывают все жанры найденных произведений'
+        )
+
+        response = client.get('/api/v1/titles/?facets=author')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестный фасет возвращает статус 400'
+        )
@@ -0,0 +1,70 @@
+import pytest
+from django.core.management import call_command
+
+
+class Test21GenreFilter:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_genre_modes(self, client, django_assert_max_num_queries):
+        from reviews.models import Title
+
+        call_command(
+            'generate_dataset', users=20, categories=3, genres=6, titles=300,
+            reviews=200, comments=0, seed=5,
+        )
+        genres = {
+            title.id: {genre.slug for genre in title.genre.all()}
+            for title in Title.objects.prefetch_related('genre')
+        }
+        wanted = {'genre-1', 'genre-2'}
+        url = '/api/v1/titles/?genre=genre-1,genre-2&limit=1000'
+
+        with django_assert_max_num_queries(4):
+            response = client.get(url)
+        ids = [title['id'] for title in response.json()['results']]
+        assert len(ids) == len(set(ids)), (
+            'Проверьте, что фильтр по нескольким жанрам не дублирует произведения'
+        )
+        assert set(ids) == {pk for pk, slugs in genres.items() if slugs & wanted}, (
+            'Проверьте, что `genre=a,b` возвращает произведения хотя бы '
+            'с одним из жанров'
+        )
+        assert response.json()['count'] == len(ids), (
+            'Проверьте, что `count` совпадает с числом найденных произведений'
+        )
+
+        with django_assert_max_num_queries(4):
+            response = client.get(url + '&genre_mode=all')
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids and sorted(ids) == sorted(
+            pk for pk, slugs in genres.items() if wanted <= slugs
+        ), (
+            'Проверьте, что `genre_mode=all` возвращает произведения '
+            'со всеми перечисленными жанрами'
+        )
+
+        response = client.get('/api/v1/titles/?genre=genre-1&genre_mode=some')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестный `genre_mode` возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_year_range(self, client):
+        from reviews.models import Title
+
+        call_command(
+            'generate_dataset', users=5, categories=2, genres=3, titles=100,
+            reviews=0, comments=0, seed=7,
+        )
+        response = client.get(
+            '/api/v1/titles/?year_min=1950&year_max=1999&limit=1000'
+        )
+        years = [title['year'] for title in response.json()['results']]
+        assert years and all(1950 <= year <= 1999 for year in years), (
+            'Проверьте, что `year_min` и `year_max` ограничивают год выпуска'
+        )
+        assert len(years) == Title.objects.filter(
+            year__gte=1950, year__lte=1999
+        ).count(), (
+            'Проверьте, что диапазон лет включает границы'
+        )
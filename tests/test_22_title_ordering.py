@@ -0,0 +1,80 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+
+class Test22TitleOrdering:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_ordering_with_cursor(self, client):
+        call_command(
+            'generate_dataset', users=20, categories=3, genres=5, titles=60,
+            reviews=150, comments=0, seed=3,
+        )
+        from reviews.models import Title
+
+        ordering = '-rating,-year,-review_count,name'
+        response = client.get(f'/api/v1/titles/?ordering={ordering}&limit=100')
+        titles = response.json()['results']
+        # без оценок (NULL) в конце, как при сортировке по убыванию в SQLite
+        expected = sorted(
+            Title.objects.values('id', 'rating', 'year', 'review_count', 'name'),
+            key=lambda title: (
+                title['rating'] is None, -(title['rating'] or 0),
+                -title['year'], -title['review_count'], title['name'],
+                title['id'],
+            )
+        )
+        assert [title['id'] for title in titles] == [
+            title['id'] for title in expected
+        ], (
+            'Проверьте, что `?ordering=` сортирует произведения по рейтингу, '
+            'году, числу отзывов и названию'
+        )
+        assert titles[0]['rating'] is not None and titles[-1]['rating'] is None, (
+            'Проверьте, что произведения без оценок идут в конце при `-rating`'
+        )
+
+        seen = []
+        url = f'/api/v1/titles/?ordering={ordering}&cursor=&limit=7'
+        while url:
+            data = client.get(url).json()
+            assert 'count' not in data, (
+                'Проверьте, что с параметром `cursor` список произведений '
+                'отдается keyset-страницами'
+            )
+            seen += [title['id'] for title in data['results']]
+            url = data['next']
+        assert seen == [title['id'] for title in titles], (
+            'Проверьте, что keyset-пагинация произведений сохраняет порядок '
+            '`ordering` и отдает все произведения без повторов'
+        )
+
+        response = client.get('/api/v1/titles/?cursor=&limit=100')
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == sorted(ids), (
+            'Проверьте, что без `ordering` keyset-страницы произведений '
+            'упорядочены по id'
+        )
+
+    @pytest.mark.django_db
+    def test_02_ordering_uses_index(self):
+        from api.views import TitleViewSet
+
+        for field, index in (('-rating', 'title_rating_idx'),
+                             ('-review_count', 'title_review_count_idx'),
+                             ('name', 'title_name_idx')):
+            order = ('-id',) if field.startswith('-') else ('id',)
+            queryset = TitleViewSet.queryset.order_by(field, *order)[:10]
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plan = [row[-1] for row in cursor.fetchall()]
+            assert any(index in step for step in plan), (
+                f'Проверьте, что сортировка `{field}` читает индекс '
+                f'`{index}`. План: {plan}'
+            )
+            assert not any('TEMP B-TREE' in step for step in plan), (
+                f'Проверьте, что сортировка `{field}` не сортирует строки '
+                f'во временном дереве. План: {plan}'
+            )
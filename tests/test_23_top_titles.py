@@ -0,0 +1,84 @@
+import pytest
+from django.core.management import call_command
+
+
+class Test23TopTitles:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_weighted_leaderboard(self, client, django_assert_num_queries):
+        from reviews.models import Category, Genre, Title, TopTitle
+
+        books = Category.objects.create(name='Книги', slug='books')
+        films = Category.objects.create(name='Фильмы', slug='films')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        # (оценки, отзывов, категория)
+        stats = ((10, 1, books), (9.2, 500, books), (8.5, 40, films),
+                 (5, 200, films), (None, 0, films))
+        titles = []
+        for number, (mean, count, category) in enumerate(stats, start=1):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category,
+                score_sum=round((mean or 0) * count), review_count=count,
+                rating=mean,
+            )
+            title.genre.set([drama])
+            titles.append(title)
+
+        call_command('rebuild_top_titles', prior_weight=10)
+        assert not Title.objects.filter(
+            id__in=TopTitle.objects.values('title_id'), review_count=0
+        ).exists(), (
+            'Проверьте, что в списки лучших попадают только произведения с отзывами'
+        )
+
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/titles/top/')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [title['id'] for title in results] == [
+            titles[1].id, titles[2].id, titles[0].id, titles[3].id
+        ], (
+            'Проверьте, что `/api/v1/titles/top/` упорядочивает произведения '
+            'по взвешенному рейтингу: одна оценка 10 не выше 500 оценок 9.2'
+        )
+        total = sum(mean * count for mean, count, _ in stats if mean)
+        prior = total / 741
+        assert results[2]['weighted_rating'] == round(
+            (10 + 10 * prior) / 11, 2
+        ), (
+            'Проверьте, что взвешенный рейтинг считается как '
+            '(score_sum + m * C) / (review_count + m)'
+        )
+        assert {'name', 'genre', 'category', 'rating'} <= set(results[0]), (
+            'Проверьте, что места списка содержат поля произведения'
+        )
+
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/titles/top/')
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что список лучших отдается из кеша'
+        )
+
+        response = client.get('/api/v1/titles/top/?category=films&limit=1')
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[2].id
+        ], (
+            'Проверьте, что `?category=` возвращает список лучших категории '
+            'с учетом `limit`'
+        )
+        response = client.get('/api/v1/titles/top/?genre=drama')
+        assert len(response.json()['results']) == 4, (
+            'Проверьте, что `?genre=` возвращает список лучших жанра'
+        )
+        assert client.get('/api/v1/titles/top/?genre=nope').status_code == 404, (
+            'Проверьте, что для несуществующего жанра возвращается статус 404'
+        )
+
+        call_command('rebuild_top_titles', prior_weight=0, size=1)
+        response = client.get('/api/v1/titles/top/')
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[0].id
+        ], (
+            'Проверьте, что после `rebuild_top_titles` кеш списка сбрасывается, '
+            'а без априорной оценки рейтинг равен средней оценке'
+        )
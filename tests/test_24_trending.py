@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+
+
+class Test24Trending:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_trending(self, client, admin, user, moderator,
+                         django_assert_num_queries, settings):
+        from django.utils import timezone
+
+        from api.trending import heap
+        from reviews.models import Comment, Review, Title, TitleTrend
+
+        fresh = Title.objects.create(name='Свежее', year=2020)
+        old = Title.objects.create(name='Прошлое', year=2020)
+        Title.objects.create(name='Без отзывов', year=2020)
+        review = Review.objects.create(
+            title=fresh, author=admin, text='Отлично', score=9
+        )
+        for author in (admin, user, moderator):
+            Review.objects.create(title=old, author=author, text='Хорошо', score=8)
+        assert TitleTrend.objects.count() == 2, (
+            'Проверьте, что активность произведений сохраняется при создании отзыва'
+        )
+
+        # три отзыва трое суток назад весят 3 / 2^3
+        Review.objects.filter(title=old).update(
+            pub_date=timezone.now() - timedelta(days=3)
+        )
+        call_command('rebuild_trending')
+        response = client.get('/api/v1/titles/trending/')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [title['id'] for title in results] == [fresh.id, old.id], (
+            'Проверьте, что `/api/v1/titles/trending/` упорядочивает '
+            'произведения по затухающей активности'
+        )
+        assert results[0]['trend_score'] == pytest.approx(1, abs=0.01), (
+            'Проверьте, что `trend_score` свежего отзыва близок к его весу'
+        )
+        assert results[1]['trend_score'] == pytest.approx(0.375, abs=0.01), (
+            'Проверьте, что вклад события затухает вдвое за '
+            '`TRENDING_HALF_LIFE_HOURS`'
+        )
+
+        old_review = Review.objects.filter(title=old).first()
+        for author in (admin, user):
+            Comment.objects.create(review=old_review, author=author, text='Да')
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/titles/trending/')
+        assert [title['id'] for title in response.json()['results']] == [
+            old.id, fresh.id
+        ], (
+            'Проверьте, что новые комментарии сразу обновляют список популярного '
+            'без пересчета по таблице отзывов'
+        )
+
+        settings.TRENDING_HEAP_SIZE = 1
+        heap.reset()
+        response = client.get('/api/v1/titles/trending/?limit=10')
+        assert [title['id'] for title in response.json()['results']] == [old.id], (
+            'Проверьте, что куча популярного ограничена `TRENDING_HEAP_SIZE`'
+        )
+        Comment.objects.create(review=review, author=user, text='Ого')
+        Review.objects.create(title=fresh, author=user, text='Да', score=7)
+        response = client.get('/api/v1/titles/trending/')
+        assert [title['id'] for title in response.json()['results']] == [fresh.id], (
+            'Проверьте, что произведение вытесняет другое из ограниченной кучи '
+            'после новых событий'
+        )
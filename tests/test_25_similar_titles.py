@@ -0,0 +1,80 @@
+import pytest
+from django.core.management import call_command
+
+
+class Test25SimilarTitles:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_similar(self, client, admin, user, moderator,
+                        django_assert_num_queries):
+        from reviews.models import Genre, Review, SimilarTitle, Title
+
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        horror = Genre.objects.create(name='Ужасы', slug='horror')
+        first, twin, half, other = (
+            Title.objects.create(name=name, year=2000)
+            for name in ('Первое', 'Близнец', 'Половина', 'Другое')
+        )
+        first.genre.set([drama, comedy])
+        twin.genre.set([drama, comedy])
+        half.genre.set([drama])
+        other.genre.set([horror])
+        scores = ((admin, 10, 9, 2), (user, 9, 10, 3), (moderator, 8, 8, 1))
+        for author, first_score, other_score, twin_score in scores:
+            for title, score in ((first, first_score), (other, other_score),
+                                 (twin, twin_score)):
+                Review.objects.create(
+                    title=title, author=author, text='Текст', score=score
+                )
+
+        call_command('rebuild_similar_titles', genre_weight=1)
+        url = f'/api/v1/titles/{first.id}/similar/'
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [(title['id'], title['similarity']) for title in results] == [
+            (twin.id, 1.0), (half.id, 0.5)
+        ], (
+            'Проверьте, что `/api/v1/titles/{title_id}/similar/` ранжирует '
+            'произведения по сходству жанров (коэффициент Жаккара)'
+        )
+        assert {'name', 'genre', 'category'} <= set(results[0]), (
+            'Проверьте, что похожие произведения содержат поля произведения'
+        )
+
+        call_command('rebuild_similar_titles', genre_weight=0, shrink=0)
+        response = client.get(url)
+        assert [title['id'] for title in response.json()['results']] == [
+            other.id
+        ], (
+            'Проверьте, что близость оценок учитывает общих оценщиков, '
+            'а после пересборки кеш ответа сбрасывается'
+        )
+        assert SimilarTitle.objects.filter(title=first).count() == 1
+
+        response = client.get('/api/v1/titles/999/similar/')
+        assert response.status_code == 404, (
+            'Проверьте, что для несуществующего произведения возвращается 404'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_blocks(self):
+        from reviews.models import SimilarTitle
+
+        call_command('generate_dataset', users=30, categories=2, genres=4,
+                     titles=40, reviews=300, comments=0, seed=2)
+
+        def neighbors():
+            return list(SimilarTitle.objects.order_by(
+                'title_id', 'position'
+            ).values_list('title_id', 'similar_id'))
+
+        call_command('rebuild_similar_titles', size=5)
+        whole = neighbors()
+        call_command('rebuild_similar_titles', size=5, block_size=7)
+        assert whole and neighbors() == whole, (
+            'Проверьте, что результат `rebuild_similar_titles` не зависит '
+            'от размера блока'
+        )
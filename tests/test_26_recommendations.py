@@ -0,0 +1,105 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client
+
+
+class Test26Recommendations:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_recommendations(self, client, django_assert_num_queries):
+        from reviews.models import Recommendation, Review
+        from users.models import User
+
+        call_command('generate_dataset', users=30, categories=2, genres=4,
+                     titles=40, reviews=400, comments=0, seed=2)
+        call_command('rebuild_recommendations', size=5, workers=1)
+        single = list(Recommendation.objects.order_by(
+            'user_id', 'position'
+        ).values_list('user_id', 'title_id'))
+        assert single, (
+            'Проверьте, что `rebuild_recommendations` сохраняет рекомендации'
+        )
+        call_command('rebuild_recommendations', size=5, workers=2)
+        assert single == list(Recommendation.objects.order_by(
+            'user_id', 'position'
+        ).values_list('user_id', 'title_id')), (
+            'Проверьте, что результат не зависит от числа процессов'
+        )
+
+        user = User.objects.get(id=single[0][0])
+        user_client = auth_client(user)
+        with django_assert_num_queries(3):
+            response = user_client.get(
+                '/api/v1/users/me/recommendations/?limit=3'
+            )
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == 3, (
+            'Проверьте, что `/api/v1/users/me/recommendations/` учитывает `limit`'
+        )
+        reviewed = set(
+            Review.objects.filter(author=user).values_list('title_id', flat=True)
+        )
+        assert not reviewed & {title['id'] for title in results}, (
+            'Проверьте, что в рекомендации не попадают произведения '
+            'с отзывом пользователя'
+        )
+        scores = [title['predicted_score'] for title in results]
+        assert scores == sorted(scores, reverse=True) and all(
+            1 <= score <= 10 for score in scores
+        ), (
+            'Проверьте, что рекомендации упорядочены по предсказанной оценке'
+        )
+
+        response = client.get('/api/v1/users/me/recommendations/')
+        assert response.status_code == 401, (
+            'Проверьте, что рекомендации доступны только авторизованным'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_benchmark(self, tmp_path):
+        from reviews.models import Review
+
+        call_command('generate_dataset', users=20, categories=2, genres=3,
+                     titles=20, reviews=150, comments=0, seed=4)
+        report_path = tmp_path / 'recommendations.json'
+        call_command('benchmark_recommendations', reviews='50,100,1000',
+                     iterations=2, workers=1, output=str(report_path))
+        report = json.loads(report_path.read_text(encoding='utf-8'))
+        assert [row['reviews'] for row in report] == [
+            50, 100, Review.objects.count()
+        ], (
+            'Проверьте, что `benchmark_recommendations` замеряет построение '
+            'для каждого числа отзывов'
+        )
+        assert all(
+            row['factorize_s'] >= 0 and row['scoring_s'] >= 0
+            for row in report
+        ), (
+            'Проверьте, что `benchmark_recommendations` отдельно замеряет '
+            'разложение и подбор лучших произведений'
+        )
+
+    def test_03_spawn_workers(self, monkeypatch):
+        from api import recommendations
+
+        ratings = [
+            (user, title, (user * 7 + title * 3) % 10 + 1)
+            for user in range(40) for title in range(30)
+            if (user + title) % 3
+        ]
+        monkeypatch.setattr(recommendations, 'SOLVE_CHUNK', 7)
+        monkeypatch.setattr(recommendations, 'SCORE_BLOCK', 300)
+        single = recommendations.recommend(
+            ratings, 5, workers=1, iterations=2
+        )
+        monkeypatch.setattr(recommendations, 'START_METHOD', 'spawn')
+        assert recommendations.recommend(
+            ratings, 5, workers=2, iterations=2
+        ) == single, (
+            'Проверьте, что процессы пула получают факторы явно '
+            '(не только при fork)'
+        )
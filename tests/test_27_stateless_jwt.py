@@ -0,0 +1,101 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .common import auth_client
+
+
+def token_client(user):
+    from django.contrib.auth.tokens import default_token_generator
+
+    response = APIClient().post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    assert response.status_code == 200, (
+        'Проверьте, что `/api/v1/auth/token/` выдает токен по коду подтверждения'
+    )
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}')
+    return client
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+class Test27StatelessJwt:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_read_without_user_query(self, user):
+        url = '/api/v1/categories/'
+        APIClient().get(url)
+        plain = count_queries(auth_client(user), url)
+        stateless = count_queries(token_client(user), url)
+        assert stateless == plain - 1, (
+            'Проверьте, что токен с claims роли не требует запроса '
+            'пользователя из БД на чтении'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_writes_and_revocation(self, user, admin):
+        client = token_client(admin)
+        response = client.post(
+            '/api/v1/categories/', data={'name': 'Книги', 'slug': 'books'}
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что изменяющие запросы с новым токеном работают'
+        )
+        response = client.get('/api/v1/users/me/')
+        assert response.json()['username'] == admin.username, (
+            'Проверьте, что `/api/v1/users/me/` возвращает профиль '
+            'пользователя из токена'
+        )
+
+        client = token_client(user)
+        assert client.get('/api/v1/users/').status_code == 403
+        user.role = 'admin'
+        user.save()
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что после смены роли claims старого токена не используются'
+        )
+
+        user.delete()
+        assert client.get('/api/v1/categories/').status_code == 401, (
+            'Проверьте, что токен удаленного пользователя не принимается'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_privileged_claims_need_shared_revocations(self, admin,
+                                                         settings, tmp_path):
+        from users.models import User
+
+        client = token_client(admin)
+        url = '/api/v1/users/'
+        assert client.get(url).status_code == 200
+        # понижение роли в другом воркере: отметка об отзыве сюда не дошла
+        User.objects.filter(pk=admin.pk).update(role='user')
+        assert client.get(url).status_code == 403, (
+            'Проверьте, что при локальном кеше отзыва права администратора '
+            'на чтении проверяются по БД'
+        )
+
+        User.objects.filter(pk=admin.pk).update(role='admin')
+        settings.CACHES = dict(settings.CACHES, revocations={
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        })
+        settings.JWT_REVOCATION_CACHE_ALIAS = 'revocations'
+        client = token_client(admin)
+        url = '/api/v1/categories/'
+        APIClient().get(url)
+        assert count_queries(client, url) == count_queries(
+            auth_client(admin), url
+        ) - 1, (
+            'Проверьте, что с общим кешем отзыва claims администратора '
+            'используются без запроса к БД'
+        )
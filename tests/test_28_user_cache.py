@@ -0,0 +1,64 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .common import auth_client
+
+
+def cache_counter(result):
+    from prometheus_client import REGISTRY
+
+    return REGISTRY.get_sample_value(
+        'yamdb_user_cache_total', {'result': result}
+    ) or 0
+
+
+class Test28UserCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_identity_cache(self, user, admin, settings):
+        from api.user_cache import users
+
+        url = '/api/v1/categories/'
+        APIClient().get(url)
+        client = auth_client(user)
+        hits, misses = cache_counter('hit'), cache_counter('miss')
+        with CaptureQueriesContext(connection) as first:
+            client.get(url)
+        with CaptureQueriesContext(connection) as second:
+            assert client.get(url).status_code == 200
+        assert len(second.captured_queries) == len(first.captured_queries) - 1, (
+            'Проверьте, что повторный запрос берет пользователя из кеша '
+            'без запроса к БД'
+        )
+        assert (cache_counter('hit') - hits, cache_counter('miss') - misses) == (1, 1), (
+            'Проверьте, что кеш пользователей считает попадания и промахи'
+        )
+
+        assert client.get('/api/v1/users/').status_code == 403
+        user.role = 'admin'
+        user.save()
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли сбрасывает запись кеша пользователей'
+        )
+
+        settings.USER_CACHE_SIZE = 1
+        auth_client(admin).get(url)
+        assert list(users.entries) == [admin.id], (
+            'Проверьте, что кеш пользователей ограничен `USER_CACHE_SIZE`'
+        )
+
+        user.is_active = False
+        user.save()
+        assert client.get(url).status_code == 401, (
+            'Проверьте, что неактивный пользователь не проходит аутентификацию'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_metrics(self, client, user):
+        auth_client(user).get('/api/v1/categories/')
+        response = client.get('/api/metrics')
+        assert 'yamdb_user_cache_total{result="miss"}' in response.content.decode(), (
+            'Проверьте, что счетчики кеша пользователей публикуются в `/api/metrics`'
+        )
@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+def signup(client, number):
+    return client.post('/api/v1/auth/signup/', data={
+        'username': f'outbox_{number}',
+        'email': f'outbox_{number}@yamdb.fake',
+    })
+
+
+class Test29EmailOutbox:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_enqueues(self, client, settings):
+        from users.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_EAGER = False
+        assert signup(client, 1).status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо в запросе'
+        )
+        email = OutgoingEmail.objects.get()
+        assert (email.to, email.status) == (
+            'outbox_1@yamdb.fake', OutgoingEmail.PENDING
+        ), 'Проверьте, что регистрация ставит письмо в очередь'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_command_delivers(self, client, settings):
+        from users.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_EAGER = False
+        for number in range(5):
+            signup(client, number)
+        call_command('send_emails', once=True, workers=2, batch_size=2)
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'outbox_{number}@yamdb.fake' for number in range(5)
+        ], 'Проверьте, что `send_emails` отправляет каждое письмо один раз'
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.SENT
+        ).exists(), 'Проверьте, что отправленные письма помечаются sent'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_retry_with_backoff(self, client, settings):
+        from api.outbox import deliver_pending
+        from users.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_EAGER = False
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        settings.EMAIL_BACKEND = f'{__name__}.FailingBackend'
+        signup(client, 1)
+        deliver_pending()
+        email = OutgoingEmail.objects.get()
+        assert (email.status, email.attempts) == (OutgoingEmail.PENDING, 1), (
+            'Проверьте, что неудачное письмо остается в очереди'
+        )
+        assert email.next_attempt_at > timezone.now() + timedelta(
+            seconds=settings.EMAIL_OUTBOX_BACKOFF - 5
+        ), 'Проверьте, что повтор откладывается на EMAIL_OUTBOX_BACKOFF'
+        assert deliver_pending() == 0, (
+            'Проверьте, что отложенное письмо не отправляется раньше срока'
+        )
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        deliver_pending()
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (OutgoingEmail.FAILED, 2), (
+            'Проверьте, что после EMAIL_OUTBOX_MAX_ATTEMPTS попыток '
+            'письмо помечается failed'
+        )
+        assert 'SMTP недоступен' in email.last_error
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_claimed_once(self, client, settings):
+        from api.outbox import claim
+
+        settings.EMAIL_OUTBOX_EAGER = False
+        for number in range(3):
+            signup(client, number)
+        first, second = claim(2), claim(2)
+        assert len(first) == 2 and len(second) == 1, (
+            'Проверьте, что взятое воркером письмо не выдается другому'
+        )
+        assert claim(2) == []
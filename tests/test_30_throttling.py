@@ -0,0 +1,115 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+RATES = {
+    'signup': '3/min',
+    'signup_identity': '2/min',
+    'token': '100/min',
+    'token_identity': '2/min',
+}
+
+
+@pytest.fixture
+def throttle_rates(settings):
+    settings.REST_FRAMEWORK = dict(
+        settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES=RATES
+    )
+
+
+def signup(client, username, **extra):
+    return client.post('/api/v1/auth/signup/', data={
+        'username': username, 'email': f'{username}@yamdb.fake',
+    }, **extra)
+
+
+class Test30Throttling:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_by_identity(self, client, throttle_rates):
+        for _ in range(2):
+            assert signup(client, 'flood').status_code != 429
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'other', 'email': 'FLOOD@yamdb.fake',
+        })
+        assert response.status_code == 429, (
+            'Проверьте, что регистрация ограничена по email '
+            'без учета регистра'
+        )
+        assert 0 < int(response['Retry-After']) <= 30, (
+            'Проверьте, что ответ 429 содержит заголовок `Retry-After` '
+            'со временем до появления токена'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_signup_by_address(self, client, throttle_rates):
+        for number in range(3):
+            assert signup(client, f'user{number}').status_code == 200
+        assert signup(client, 'user3').status_code == 429, (
+            'Проверьте, что регистрация ограничена по адресу клиента'
+        )
+        assert signup(
+            client, 'user3', REMOTE_ADDR='10.0.0.2'
+        ).status_code == 200, (
+            'Проверьте, что лимит одного адреса не затрагивает другие'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_spoofed_forwarded_for(self, client, throttle_rates):
+        for number in range(3):
+            signup(client, f'user{number}',
+                   HTTP_X_FORWARDED_FOR=f'10.1.0.{number}')
+        assert signup(
+            client, 'user3', HTTP_X_FORWARDED_FOR='10.1.0.3'
+        ).status_code == 429, (
+            'Проверьте, что подмена X-Forwarded-For без доверенных прокси '
+            'не обходит лимит по адресу'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_non_object_body(self, client, throttle_rates):
+        for url in ('/api/v1/auth/signup/', '/api/v1/auth/token/'):
+            response = client.post(
+                url, data='[1, 2]', content_type='application/json'
+            )
+            assert response.status_code == 400, (
+                'Проверьте, что тело-массив отклоняется с ответом 400'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_token_refill(self, client, user, throttle_rates,
+                             monkeypatch):
+        from api.throttling import TokenBucketThrottle
+
+        now = [1000.0]
+        monkeypatch.setattr(
+            TokenBucketThrottle, 'timer', staticmethod(lambda: now[0])
+        )
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        url = '/api/v1/auth/token/'
+        for _ in range(2):
+            assert client.post(url, data=data).status_code == 400
+        response = client.post(url, data=data)
+        assert response.status_code == 429, (
+            'Проверьте, что подбор кода подтверждения ограничен '
+            'по имени пользователя'
+        )
+        assert response['Retry-After'] == '30'
+        now[0] += 30
+        assert client.post(url, data=data).status_code == 400, (
+            'Проверьте, что бакет пополняется на один запрос '
+            'за период / N секунд'
+        )
+        assert client.post(url, data=data).status_code == 429
+
+    def test_06_benchmark(self, tmp_path):
+        output = tmp_path / 'throttle.json'
+        call_command('benchmark_throttle', checks=200, clients=10,
+                     output=str(output))
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert [row['cache'] for row in report] == ['default'], (
+            'Проверьте, что `benchmark_throttle` замеряет бэкенд '
+            'THROTTLE_CACHE_ALIAS'
+        )
+        assert report[0]['mean_us'] > 0
@@ -0,0 +1,128 @@
+import json
+
+import pytest
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client
+
+URL = '/api/v1/users/bulk/'
+
+
+def ndjson(rows):
+    return '\n'.join(json.dumps(row) for row in rows) + '\n'
+
+
+class Test31BulkUsers:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_per_row_errors(self, admin_client, admin):
+        from users.models import User
+
+        rows = [
+            {'username': 'alpha', 'email': 'alpha@yamdb.fake'},
+            {'username': admin.username, 'email': 'taken@yamdb.fake'},
+            {'username': 'beta', 'email': 'alpha@yamdb.fake'},
+            {'username': 'gamma', 'email': 'not-an-email'},
+            {'username': 'ME', 'email': 'me@yamdb.fake'},
+            'alpha',
+            {'username': 'delta', 'email': 'delta@yamdb.fake',
+             'role': 'moderator', 'bio': 'Модератор'},
+        ]
+        response = admin_client.post(URL, data=rows, format='json')
+        assert response.status_code == 200, (
+            'Проверьте, что ошибки в строках не прерывают всю пачку'
+        )
+        data = response.json()
+        assert data['created'] == ['alpha', 'delta'], (
+            'Проверьте, что корректные строки создают пользователей'
+        )
+        errors = {error['row']: error['errors'] for error in data['errors']}
+        assert sorted(errors) == [1, 2, 3, 4, 5], (
+            'Проверьте, что ответ содержит ошибки по номерам строк'
+        )
+        assert 'username' in errors[1] and 'email' in errors[2], (
+            'Проверьте, что занятые в БД и повторенные в пачке имя и email '
+            'возвращаются как ошибки полей'
+        )
+        assert User.objects.get(username='delta').role == 'moderator'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_constant_queries(self, admin_client):
+        from users.models import User
+
+        rows = [
+            {'username': f'bulk{number}', 'email': f'bulk{number}@yamdb.fake'}
+            for number in range(300)
+        ]
+        admin_client.get('/api/v1/users/')
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(URL, data=rows, format='json')
+        assert len(response.json()['created']) == 300
+        assert User.objects.filter(username__startswith='bulk').count() == 300
+        unique_checks = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and '"username" IN' in query['sql']
+        ]
+        assert len(unique_checks) == 1, (
+            'Проверьте, что уникальность проверяется одним запросом'
+        )
+        assert len(queries.captured_queries) < 15, (
+            'Проверьте, что пользователи вставляются через `bulk_create`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_ndjson_with_codes(self, admin_client, client):
+        rows = [
+            {'username': f'stream{number}',
+             'email': f'stream{number}@yamdb.fake'}
+            for number in range(3)
+        ]
+        response = admin_client.post(
+            URL + '?send_codes=true', data=ndjson(rows),
+            content_type='application/x-ndjson',
+        )
+        assert response.status_code == 200
+        assert len(response.json()['created']) == 3, (
+            'Проверьте, что эндпоинт принимает NDJSON'
+        )
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            row['email'] for row in rows
+        ], 'Проверьте, что `send_codes` ставит коды подтверждения в очередь'
+        code = mail.outbox[0].body.rsplit(' ', 1)[-1]
+        username = mail.outbox[0].to[0].split('@')[0]
+        response = client.post('/api/v1/auth/token/', data={
+            'username': username, 'confirmation_code': code,
+        })
+        assert response.status_code == 200, (
+            'Проверьте, что код из письма массовой регистрации '
+            'выдает токен'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_invalid_requests(self, admin_client, client, user,
+                                 settings):
+        row = {'username': 'alpha', 'email': 'alpha@yamdb.fake'}
+        assert client.post(
+            URL, data=json.dumps([row]), content_type='application/json'
+        ).status_code == 401
+        assert auth_client(user).post(
+            URL, data=[row], format='json'
+        ).status_code == 403, (
+            'Проверьте, что массовое создание доступно только администратору'
+        )
+        assert admin_client.post(
+            URL, data=row, format='json'
+        ).status_code == 400, 'Проверьте, что тело должно быть массивом'
+        assert admin_client.post(
+            URL, data=ndjson([row]) + '{"username"\n',
+            content_type='application/x-ndjson',
+        ).status_code == 400, 'Проверьте, что некорректный NDJSON отклоняется'
+        settings.USERS_BULK_MAX_ROWS = 1
+        assert admin_client.post(
+            URL, data=[row, row], format='json'
+        ).status_code == 400, (
+            'Проверьте, что размер пачки ограничен `USERS_BULK_MAX_ROWS`'
+        )